@@ -0,0 +1,51 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import pytest
+
+from benchmark import generate
+
+
+#: Number of items in listings benchmarked by default.
+SIZES = [1000, 10000, 100000]
+
+#: Number of items in additional listings benchmarked with --large.
+LARGE_SIZES = [1000000, 10000000]
+
+
+def pytest_addoption(parser):
+    '''Add options for benchmarks.'''
+    parser.addoption(
+        '--large', action='store_true', default=False,
+        help='Also benchmark listings of {0} items.'.format(
+            ', '.join(str(size) for size in LARGE_SIZES)
+        )
+    )
+
+
+def pytest_generate_tests(metafunc):
+    '''Parametrize benchmarks using size with each listing size.'''
+    if 'size' in metafunc.fixturenames:
+        sizes = list(SIZES)
+        if metafunc.config.getoption('large'):
+            sizes.extend(LARGE_SIZES)
+
+        metafunc.parametrize('size', sizes, ids=[
+            '{0}k'.format(size // 1000) for size in sizes
+        ])
+
+
+@pytest.fixture(scope='session')
+def listings():
+    '''Return cache of generated listings keyed by size.'''
+    return {}
+
+
+@pytest.fixture()
+def listing(listings, size):
+    '''Return synthetic listing of *size* items.'''
+    if size not in listings:
+        listings[size] = generate.listing(size)
+
+    return listings[size]
@@ -0,0 +1,119 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Generate synthetic data resembling a visual effects production.
+
+All generators are deterministic for a given *seed* so that results are
+comparable between runs.
+
+'''
+
+import random
+
+
+#: Extensions of frame sequences and how often each is used.
+SEQUENCE_EXTENSIONS = ['exr'] * 6 + ['dpx'] * 2 + ['jpg', 'tif']
+
+#: Names of elements rendered or published for each shot.
+ELEMENTS = ['plate', 'comp', 'precomp', 'beauty', 'matte', 'roto', 'denoise']
+
+#: Names of files that are not part of any frame sequence.
+SINGLE_FILES = ['notes.txt', 'shot.nk', 'edit.edl', 'thumbnail.png']
+
+
+def listing(size, seed=0):
+    '''Return list of *size* file paths for a synthetic show.
+
+    Paths are laid out as
+    ``/show/<sequence>/<shot>/<element>/v<version>/<name>.<frame>.<ext>``
+    with frames typically numbered from 1001 and padded to four digits. A
+    small proportion of sequences are unpadded, have missing frames or
+    extend beyond 9999 so that padding is ambiguous, and some files are not
+    part of any sequence at all.
+
+    '''
+    generator = random.Random(seed)
+    items = []
+
+    sequence = 0
+    while len(items) < size:
+        sequence += 1
+        for shot in range(10, 10 * generator.randint(5, 40) + 1, 10):
+            shot_path = '/show/sq{0:03d}/sq{0:03d}_sh{1:04d}'.format(
+                sequence, shot
+            )
+            for element in generator.sample(ELEMENTS, generator.randint(2, 5)):
+                for version in range(1, generator.randint(2, 6)):
+                    name = 'sq{0:03d}_sh{1:04d}_{2}_v{3:03d}'.format(
+                        sequence, shot, element, version
+                    )
+                    directory = '{0}/{1}/v{2:03d}/'.format(
+                        shot_path, element, version
+                    )
+                    items.extend(
+                        _sequence(generator, directory + name)
+                    )
+
+            for name in SINGLE_FILES:
+                items.append('{0}/{1}'.format(shot_path, name))
+
+            if len(items) >= size:
+                break
+
+    del items[size:]
+    generator.shuffle(items)
+    return items
+
+
+def _sequence(generator, prefix):
+    '''Return items of a frame sequence starting with *prefix*.'''
+    extension = generator.choice(SEQUENCE_EXTENSIONS)
+    start = 1001
+    length = generator.randint(24, 240)
+
+    kind = generator.random()
+    if kind < 0.05:
+        # Unpadded numbering from one.
+        frames = range(1, length + 1)
+        template = '{0}.{1:d}.{2}'
+    elif kind < 0.07:
+        # Numbering crossing 9999 so that padding is ambiguous.
+        frames = range(9999 - length // 2, 9999 + length // 2)
+        template = '{0}.{1:04d}.{2}'
+    else:
+        frames = range(start, start + length)
+        template = '{0}.{1:04d}.{2}'
+
+    if generator.random() < 0.2:
+        # Drop some frames, as from a failed or partial render.
+        frames = [frame for frame in frames if generator.random() > 0.05]
+
+    return [template.format(prefix, frame, extension) for frame in frames]
+
+
+def mixed_case(items, seed=0):
+    '''Return copy of *items* with casing of some items changed.'''
+    generator = random.Random(seed)
+    result = []
+    for item in items:
+        if generator.random() < 0.1:
+            item = item.upper()
+        result.append(item)
+
+    return result
+
+
+def indexes(size, density, seed=0):
+    '''Return list of *size* sorted unique indexes.
+
+    *density* is the fraction, between zero and one, of the covered range
+    that is present, with 1.0 giving a single contiguous range.
+
+    '''
+    generator = random.Random(seed)
+    span = int(size / density)
+    if span == size:
+        return list(range(1, size + 1))
+
+    return sorted(generator.sample(range(1, span + 1), size))
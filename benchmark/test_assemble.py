@@ -0,0 +1,79 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import pytest
+
+import clique
+from benchmark import generate
+
+
+def rounds(size):
+    '''Return number of rounds to assemble listing of *size* items.'''
+    return max(1, 10000 // size)
+
+
+def test_assemble(benchmark, listing, size):
+    '''Assemble listing scanning for all runs of digits.'''
+    benchmark.pedantic(clique.assemble, args=(listing,), rounds=rounds(size))
+
+
+def test_assemble_with_digits_pattern(benchmark, listing, size):
+    '''Assemble listing using the equivalent digits pattern.
+
+    Compare with :py:func:`test_assemble`, which scans for runs of digits
+    directly.
+
+    '''
+    benchmark.pedantic(
+        clique.assemble, args=(listing,),
+        kwargs=dict(patterns=[clique.DIGITS_PATTERN]), rounds=rounds(size)
+    )
+
+
+@pytest.mark.parametrize('pattern', ['frames', 'versions'])
+def test_assemble_with_pattern(benchmark, listing, size, pattern):
+    '''Assemble listing using a common pattern.'''
+    benchmark.pedantic(
+        clique.assemble, args=(listing,),
+        kwargs=dict(patterns=[clique.PATTERNS[pattern]]),
+        rounds=rounds(size)
+    )
+
+
+@pytest.mark.parametrize('components', [1, 2])
+def test_assemble_with_components(benchmark, listing, size, components):
+    '''Assemble listing considering only the last runs of digits.'''
+    benchmark.pedantic(
+        clique.assemble, args=(listing,),
+        kwargs=dict(components=components), rounds=rounds(size)
+    )
+
+
+def test_assemble_exclusive(benchmark, listing, size):
+    '''Assemble listing with each item in at most one collection.'''
+    benchmark.pedantic(
+        clique.assemble, args=(listing,), kwargs=dict(exclusive=True),
+        rounds=rounds(size)
+    )
+
+
+def test_assemble_case_insensitive(benchmark, listing, size):
+    '''Assemble listing ignoring case.'''
+    listing = generate.mixed_case(listing)
+    benchmark.pedantic(
+        clique.assemble, args=(listing,),
+        kwargs=dict(case_sensitive=False), rounds=rounds(size)
+    )
+
+
+def test_assemble_case_insensitive_with_pattern(benchmark, listing, size):
+    '''Assemble listing ignoring case using a common pattern.'''
+    listing = generate.mixed_case(listing)
+    benchmark.pedantic(
+        clique.assemble, args=(listing,),
+        kwargs=dict(
+            patterns=[clique.PATTERNS['frames']], case_sensitive=False
+        ),
+        rounds=rounds(size)
+    )
@@ -0,0 +1,106 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import pytest
+
+import clique
+import clique.array_set
+from benchmark import generate
+
+
+DENSITIES = pytest.mark.parametrize(
+    'density', [0.1, 0.5, 0.99, 1.0],
+    ids=['very sparse', 'sparse', 'dense', 'contiguous']
+)
+
+
+def make_collection(density, size=100000):
+    '''Return collection of *size* indexes with *density*.'''
+    return clique.Collection(
+        '/show/plate.', '.exr', 4, indexes=generate.indexes(size, density)
+    )
+
+
+def setup_collection(density):
+    '''Return pedantic setup function creating collection with *density*.
+
+    Use to measure operations whose results are cached by a collection.
+
+    '''
+    indexes = generate.indexes(100000, density)
+
+    def setup():
+        return (
+            clique.Collection('/show/plate.', '.exr', 4, indexes=indexes),
+        ), {}
+
+    return setup
+
+
+@DENSITIES
+def test_format(benchmark, density):
+    '''Format collection.'''
+    benchmark.pedantic(
+        lambda collection: collection.format(),
+        setup=setup_collection(density), rounds=20
+    )
+
+
+@DENSITIES
+def test_format_cached(benchmark, density):
+    '''Format collection again without changing it.'''
+    collection = make_collection(density)
+    benchmark(collection.format)
+
+
+@DENSITIES
+def test_format_holes(benchmark, density):
+    '''Format holes of collection.'''
+    benchmark.pedantic(
+        lambda collection: collection.format(
+            '{head}{padding}{tail} [{holes}]'
+        ),
+        setup=setup_collection(density), rounds=20
+    )
+
+
+@DENSITIES
+def test_holes(benchmark, density):
+    '''Compute holes of collection.'''
+    collection = make_collection(density)
+    benchmark(collection.holes)
+
+
+@DENSITIES
+def test_holes_array(benchmark, density):
+    '''Compute holes of collection with indexes stored in an array.'''
+    pytest.importorskip('numpy')
+    collection = clique.Collection(
+        '/show/plate.', '.exr', 4, indexes=generate.indexes(100000, density),
+        storage=clique.array_set.ArraySortedSet
+    )
+    benchmark(collection.holes)
+
+
+@DENSITIES
+def test_separate(benchmark, density):
+    '''Separate collection into contiguous collections.'''
+    collection = make_collection(density)
+    benchmark(collection.separate)
+
+
+@DENSITIES
+def test_iterate(benchmark, density):
+    '''Iterate over items of collection.'''
+    collection = make_collection(density, size=10000)
+    benchmark(lambda: list(collection))
+
+
+def test_contains_many(benchmark):
+    '''Check membership of many items.'''
+    collection = make_collection(0.5)
+    items = [
+        '/show/plate.{0:04d}.exr'.format(index) for index in range(10000)
+    ]
+    benchmark(collection.contains_many, items)
@@ -0,0 +1,56 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import gc
+import sys
+
+import pytest
+
+import clique
+
+tracemalloc = pytest.importorskip('tracemalloc')
+
+
+#: Number of collections constructed when measuring memory.
+COUNT = 100000
+
+
+def bytes_per_collection(count=COUNT):
+    '''Return average bytes allocated for each of *count* collections.
+
+    Each collection holds five indexes in two runs and has a distinct head so
+    that nothing is shared between them other than interned strings.
+
+    '''
+    heads = [
+        '/show/shot_{0:06d}/plate.'.format(number) for number in range(count)
+    ]
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        collections = [
+            clique.Collection(head, '.exr', 4, indexes=[1, 2, 3, 7, 8])
+            for head in heads
+        ]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    # Exclude the list holding the collections.
+    size = after - before - sys.getsizeof(collections)
+    return size / float(count)
+
+
+def test_collection_memory(benchmark):
+    '''Measure memory allocated for each collection.
+
+    The result is reported as *bytes_per_collection* in the extra info of the
+    benchmark, such as in the saved JSON or with ``--benchmark-verbose``.
+
+    '''
+    benchmark.extra_info['bytes_per_collection'] = benchmark.pedantic(
+        bytes_per_collection, rounds=1, iterations=1
+    )
@@ -0,0 +1,51 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import pytest
+
+import clique
+from benchmark import generate
+
+
+@pytest.mark.parametrize('value', [
+    '/show/plate.%04d.exr [1001-1100]',
+    '/show/plate.%04d.exr [1-5000000]',
+    '/show/plate.%d.exr [1-10000000]'
+], ids=[
+    'small range',
+    'large range',
+    'very large range'
+])
+def test_parse_range(benchmark, value):
+    '''Parse collection with a single range of indexes.'''
+    benchmark(clique.parse, value)
+
+
+@pytest.mark.parametrize('density', [0.5, 0.99], ids=['sparse', 'dense'])
+def test_parse_ranges(benchmark, density):
+    '''Parse collection with many ranges of indexes.'''
+    collection = clique.Collection(
+        '/show/plate.', '.exr', 0,
+        indexes=generate.indexes(100000, density)
+    )
+    benchmark(clique.parse, collection.format())
+
+
+def test_parse_holes(benchmark):
+    '''Parse collection with a range and many holes.'''
+    collection = clique.Collection(
+        '/show/plate.', '.exr', 0,
+        indexes=generate.indexes(100000, 0.9)
+    )
+    pattern = '{head}{padding}{tail} [{range}] [{holes}]'
+    benchmark(clique.parse, collection.format(pattern), pattern)
+
+
+def test_parse_many(benchmark, listing):
+    '''Parse formatted collections assembled from listing.'''
+    collections, _ = clique.assemble(
+        listing, patterns=[clique.PATTERNS['frames']]
+    )
+    values = [collection.format() for collection in collections]
+    benchmark(lambda: list(clique.parse_many(values)))
@@ -0,0 +1,94 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import random
+
+import pytest
+
+from clique.sorted_set import SortedSet
+from benchmark import generate
+
+
+DENSITIES = pytest.mark.parametrize(
+    'density', [0.1, 0.5, 1.0], ids=['very sparse', 'sparse', 'contiguous']
+)
+
+
+def shuffled(items, seed=0):
+    '''Return shuffled copy of *items*.'''
+    items = list(items)
+    random.Random(seed).shuffle(items)
+    return items
+
+
+@DENSITIES
+def test_add(benchmark, density):
+    '''Add indexes one at a time in random order.'''
+    indexes = shuffled(generate.indexes(10000, density))
+
+    def add():
+        sorted_set = SortedSet()
+        for index in indexes:
+            sorted_set.add(index)
+
+    benchmark(add)
+
+
+@DENSITIES
+def test_add_sorted(benchmark, density):
+    '''Add indexes one at a time in order.'''
+    indexes = generate.indexes(10000, density)
+
+    def add():
+        sorted_set = SortedSet()
+        for index in indexes:
+            sorted_set.add(index)
+
+    benchmark(add)
+
+
+@DENSITIES
+def test_update(benchmark, density):
+    '''Update with many indexes at once.'''
+    indexes = shuffled(generate.indexes(100000, density))
+    benchmark(lambda: SortedSet().update(indexes))
+
+
+@DENSITIES
+def test_update_existing(benchmark, density):
+    '''Update set that already has members.'''
+    indexes = generate.indexes(100000, density)
+    existing = indexes[::2]
+    other = indexes[1::2]
+
+    def setup():
+        return (SortedSet(existing),), {}
+
+    benchmark.pedantic(
+        lambda sorted_set: sorted_set.update(other), setup=setup, rounds=20
+    )
+
+
+@DENSITIES
+def test_contains(benchmark, density):
+    '''Check membership of many indexes.'''
+    indexes = generate.indexes(100000, density)
+    sorted_set = SortedSet(indexes)
+    candidates = shuffled(range(1, indexes[-1] + 1))[:10000]
+
+    benchmark(lambda: [index in sorted_set for index in candidates])
+
+
+@DENSITIES
+def test_discard(benchmark, density):
+    '''Discard indexes one at a time.'''
+    indexes = generate.indexes(10000, density)
+    candidates = shuffled(indexes)
+
+    def discard():
+        sorted_set = SortedSet(indexes)
+        for index in candidates:
+            sorted_set.discard(index)
+
+    benchmark(discard)
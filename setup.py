@@ -30,10 +30,17 @@ DOC_REQUIRES = [
     'sphinx_rtd_theme >= 0.1.6, < 1',
     'lowdown >= 0.1.0, < 1'
 ]
+ARRAY_REQUIRES = [
+    'numpy >= 1.9'
+]
 TEST_REQUIRES = [
     'pytest-runner >= 2.7, < 3',
-    'pytest >= 2.3.5, < 3',
-    'pytest-cov >= 2, < 3'
+    'pytest >= 3.8',
+    'pytest-cov >= 2.6, < 3'
+]
+BENCHMARK_REQUIRES = [
+    'pytest >= 3.8',
+    'pytest-benchmark >= 3.1'
 ]
 
 # Readthedocs requires Sphinx extensions to be specified as part of
@@ -58,8 +65,10 @@ setup(
     },
     install_requires=INSTALL_REQUIRES,
     extras_require={
+        'array': ARRAY_REQUIRES,
         'doc': DOC_REQUIRES,
         'test': TEST_REQUIRES,
+        'benchmark': BENCHMARK_REQUIRES,
         'dev': DOC_REQUIRES + TEST_REQUIRES
     },
     zip_safe=False
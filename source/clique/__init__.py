@@ -2,17 +2,35 @@
 # :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
 # :license: See LICENSE.txt.
 
+import heapq
 import re
-from collections import defaultdict
+from collections import OrderedDict
 
 from ._version import __version__
 from .collection import Collection
+from .collection_index import CollectionIndex
+from .cache import LruCache
 from .error import CollectionError
+from .filesystem import scan, scan_tree, ScanResult
+from .sorted_set import SortedSet
+from .stats import AssemblyStats, clock as _clock
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
 
 
 #: Pattern for matching an index with optional padding.
 DIGITS_PATTERN = '(?P<index>(?P<padding>0*)\d+)'
 
+#: Expression matching each run of digits.
+_DIGITS_EXPRESSION = re.compile(r'\d+')
+
+#: Cache of compiled expressions for :py:func:`parse` patterns. Inspect usage
+#: with :py:meth:`LruCache.info <clique.cache.LruCache.info>`.
+parse_cache = LruCache(maxsize=128)
+
 #: Common patterns that can be passed to :py:func:`~clique.assemble`.
 PATTERNS = {
     'frames': '\.{0}\.\D+\d?$'.format(DIGITS_PATTERN),
@@ -22,7 +40,8 @@ PATTERNS = {
 
 def assemble(
     iterable, patterns=None, minimum_items=2, case_sensitive=True,
-    assume_padded_when_ambiguous=False
+    assume_padded_when_ambiguous=False, stats=None, components=None,
+    exclusive=False
 ):
     '''Assemble items in *iterable* into discreet collections.
 
@@ -42,6 +61,29 @@ def assemble(
     possible groupings of the items in *iterable* based around common numerical
     components.
 
+    .. note::
+
+        Without *patterns*, items are scanned for runs of digits directly,
+        which is faster than, but otherwise identical to, passing
+        :py:data:`DIGITS_PATTERN` as the only pattern.
+
+    Items with many runs of digits, such as paths with numbered directories,
+    produce a candidate collection for each run even though most end up
+    discarded. When *patterns* is not specified, set *components* to only
+    consider the last *components* runs of digits in each item as an index.
+    For example, with *components* of 1 only "1001" is considered in
+    "/show/sq010/v003/plate.1001.exr". The collections returned are the same
+    as without *components* apart from omitting those indexed by earlier
+    runs of digits, and the remainder is formed against these as usual.
+
+    By default an item can be a member of several returned collections, such
+    as one for each run of digits. Set *exclusive* to True to instead assign
+    each item to at most one collection. Collections are then chosen in order
+    of most members, preferring the collection indexed by the rightmost run
+    of digits and then the padded collection when tied. Members of a chosen
+    collection are removed from the remaining candidates, which are only
+    returned if they still have at least *minimum_items* members.
+
     *minimum_items* dictates the minimum number of items a collection must have
     in order to be included in the result. The default is 2, filtering out
     single item collections.
@@ -68,142 +110,770 @@ def assemble(
         unambiguous. For example, 1-100 will always be considered unpadded
         regardless of the *assume_padded_when_ambiguous* setting.
 
+    *stats* may be an :py:class:`~clique.stats.AssemblyStats` instance to
+    record the time spent in each phase of assembly along with counts such
+    as the number of candidate keys and the size of the remainder. Recording
+    is skipped entirely when *stats* is not specified.
+
     Return tuple of two lists (collections, remainder) where 'collections' is a
     list of assembled :py:class:`~clique.collection.Collection` instances and
     'remainder' is a list of items that did not belong to any collection.
 
     '''
-    collection_map = defaultdict(set)
-    collections = []
-    remainder = []
+    assembler = Assembler(
+        patterns=patterns, minimum_items=minimum_items,
+        case_sensitive=case_sensitive,
+        assume_padded_when_ambiguous=assume_padded_when_ambiguous,
+        stats=stats, components=components, exclusive=exclusive
+    )
+    assembler.feed(iterable)
+    return assembler.collections(), assembler.remainder()
 
-    # Compile patterns.
-    flags = 0
-    if not case_sensitive:
-        flags |= re.IGNORECASE
 
-    compiled_patterns = []
+class Assembler(object):
+    '''Incrementally assemble items into discreet collections.
 
-    if patterns is not None:
-        if not patterns:
-            return collections, list(iterable)
+    Items can be fed in any number of batches and the collections assembled so
+    far queried at any point. The result after feeding all items is the same
+    as calling :py:func:`~clique.assemble` with the combined items::
 
-        for pattern in patterns:
-            if isinstance(pattern, basestring):
-                compiled_patterns.append(re.compile(pattern, flags=flags))
-            else:
-                compiled_patterns.append(pattern)
+        >>> assembler = Assembler()
+        >>> assembler.feed(['file.0001.jpg', 'file.0002.jpg'])
+        >>> assembler.feed(['file.0003.jpg'])
+        >>> assembler.collections()
+        [<Collection "file.%04d.jpg [1-3]">]
 
-    else:
-        compiled_patterns.append(re.compile(DIGITS_PATTERN, flags=flags))
+    Collections are formed again on query only for the heads and tails of
+    items fed since the previous query, so querying after each small batch,
+    such as when watching a folder, stays cheap as the number of items seen
+    grows. With *exclusive* set, the selection of collections depends on all
+    items so every query forms all collections again.
+
+    '''
+
+    def __init__(
+        self, patterns=None, minimum_items=2, case_sensitive=True,
+        assume_padded_when_ambiguous=False, stats=None, components=None,
+        exclusive=False
+    ):
+        '''Initialise assembler.
+
+        *patterns*, *minimum_items*, *case_sensitive*,
+        *assume_padded_when_ambiguous*, *stats*, *components* and *exclusive*
+        have the same meaning as for :py:func:`~clique.assemble`.
+
+        raise :py:exc:`ValueError` if *components* is less than one.
+
+        '''
+        super(Assembler, self).__init__()
+        if components is not None and components < 1:
+            raise ValueError('Components must be at least one.')
+
+        self.stats = stats
+        self.components = components
+        self.exclusive = exclusive
+        self.minimum_items = minimum_items
+        self.case_sensitive = case_sensitive
+        self.assume_padded_when_ambiguous = assume_padded_when_ambiguous
+
+        # Compile patterns.
+        flags = 0
+        if not case_sensitive:
+            flags |= re.IGNORECASE
+
+        # Without patterns, items are scanned directly for runs of digits,
+        # which avoids the overhead of the named groups in DIGITS_PATTERN.
+        self._patterns = None
+        if patterns is not None:
+            self._patterns = []
+            for pattern in patterns:
+                if isinstance(pattern, string_types):
+                    self._patterns.append(re.compile(pattern, flags=flags))
+                else:
+                    self._patterns.append(pattern)
+
+        # Ordered so that results follow the order items were fed in.
+        self._collection_map = OrderedDict()
+        self._pending = OrderedDict()
+        self._unmatched = []
+        self._result = None
+
+        # State kept between queries so that only the (head, tail) groups
+        # changed since the previous query need forming again.
+        self._keys = {}
+        self._dirty = OrderedDict()
+        self._formed = {}
+        self._unfiltered = OrderedDict()
+        self._merges = {}
+        self._ambiguous = {}
+
+        # Members of collections with too few indexes, keyed by collection
+        # key, those that are in the remainder and, by (head, tail), the
+        # candidates that could be members of a collection in that group.
+        self._candidates = {}
+        self._checked = set()
+        self._remainder = OrderedDict()
+        self._watchers = None
+
+        # Unfiltered collections grouped by head and tail, along with the
+        # number of them having digits adjacent to their index.
+        self._membership_map = {}
+        self._partial_digits = 0
+        self._partial = False
+
+    def feed(self, items):
+        '''Process *items* and add them to the assembled state.'''
+        self._result = None
+
+        stats = self.stats
+        if stats is not None:
+            try:
+                stats.items += len(items)
+            except TypeError:
+                items = _counted(items, stats)
+
+            unmatched = len(self._unmatched)
+            mark = _clock()
+
+        if self._patterns is None:
+            self._feed_digits(items)
+        else:
+            self._feed_patterns(items)
+
+        if stats is not None:
+            stats.timings['scan'] += _clock() - mark
+            stats.unmatched += len(self._unmatched) - unmatched
+
+    def _feed_digits(self, items):
+        '''Process *items* by scanning for every run of digits.
+
+        Equivalent to :py:meth:`_feed_patterns` with :py:data:`DIGITS_PATTERN`
+        as the only pattern. An index is padded when it has a leading zero and
+        more than one digit.
 
-    # Process iterable.
-    for item in iterable:
-        matched = False
+        '''
+        collection_map = self._collection_map
+        pending = self._pending
+        unmatched = self._unmatched
+        case_sensitive = self.case_sensitive
+        finditer = _DIGITS_EXPRESSION.finditer
 
-        for pattern in compiled_patterns:
-            for match in pattern.finditer(item):
-                index = match.group('index')
+        components = self.components
+        if components is not None:
+            def finditer(item, finditer=finditer):
+                '''Return last runs of digits in *item*.'''
+                return list(finditer(item))[-components:]
 
-                head = item[:match.start('index')]
-                tail = item[match.end('index'):]
+        for item in items:
+            matched = False
+
+            for match in finditer(item):
+                start, end = match.span()
+                index = item[start:end]
+
+                head = item[:start]
+                tail = item[end:]
 
                 if not case_sensitive:
                     head = head.lower()
                     tail = tail.lower()
 
-                padding = match.group('padding')
-                if padding:
-                    padding = len(index)
-                else:
-                    padding = 0
+                padding = 0
+                if index[0] == '0' and end - start > 1:
+                    padding = end - start
 
                 key = (head, tail, padding)
-                collection_map[key].add(int(index))
+                indexes = pending.get(key)
+                if indexes is None:
+                    indexes = pending[key] = []
+                    if key not in collection_map:
+                        collection_map[key] = SortedSet()
+
+                indexes.append(int(index))
                 matched = True
 
-        if not matched:
-            remainder.append(item)
-
-    # Form collections.
-    merge_candidates = []
-    for (head, tail, padding), indexes in collection_map.items():
-        collection = Collection(head, tail, padding, indexes)
-        collections.append(collection)
-
-        if collection.padding == 0:
-            merge_candidates.append(collection)
-
-    # Merge together collections that align on padding boundaries. For example,
-    # 0998-0999 and 1000-1001 can be merged into 0998-1001. Note that only
-    # indexes within the padding width limit are merged. If a collection is
-    # entirely merged into another then it will not be included as a separate
-    # collection in the results.
-    fully_merged = []
-    for collection in collections:
-        if collection.padding == 0:
-            continue
+            if not matched:
+                unmatched.append(item)
+
+    def _feed_patterns(self, items):
+        '''Process *items* by matching against each pattern.'''
+        collection_map = self._collection_map
+        pending = self._pending
+        unmatched = self._unmatched
+        case_sensitive = self.case_sensitive
+
+        for item in items:
+            matched = False
+
+            for pattern in self._patterns:
+                for match in pattern.finditer(item):
+                    index = match.group('index')
+
+                    head = item[:match.start('index')]
+                    tail = item[match.end('index'):]
+
+                    if not case_sensitive:
+                        head = head.lower()
+                        tail = tail.lower()
 
-        for candidate in merge_candidates:
-            if (
-                candidate.head == collection.head and
-                candidate.tail == collection.tail
-            ):
-                merged_index_count = 0
-                for index in candidate.indexes:
-                    if len(str(abs(index))) == collection.padding:
-                        collection.indexes.add(index)
-                        merged_index_count += 1
-
-                if merged_index_count == len(candidate.indexes):
-                    fully_merged.append(candidate)
-
-    # Filter out fully merged collections.
-    collections = [collection for collection in collections
-                   if collection not in fully_merged]
-
-    # Filter out collections that do not have at least as many indexes as
-    # minimum_items. In addition, add any members of a filtered collection,
-    # which are not members of an unfiltered collection, to the remainder.
-    filtered = []
-    remainder_candidates = []
-    for collection in collections:
-        if len(collection.indexes) >= minimum_items:
-            filtered.append(collection)
+                    padding = match.group('padding')
+                    if padding:
+                        padding = len(index)
+                    else:
+                        padding = 0
+
+                    key = (head, tail, padding)
+                    indexes = pending.get(key)
+                    if indexes is None:
+                        indexes = pending[key] = []
+                        if key not in collection_map:
+                            collection_map[key] = SortedSet()
+
+                    indexes.append(int(index))
+                    matched = True
+
+            if not matched:
+                unmatched.append(item)
+
+    def merge(self, assembler):
+        '''Merge state of *assembler* into this assembler.
+
+        *assembler* should have been constructed with the same options as this
+        assembler. Merging the assemblers of consecutive batches in order gives
+        the same result as feeding all the batches to a single assembler.
+
+        '''
+        self._result = None
+        assembler._flush()
+
+        if (
+            self.stats is not None and assembler.stats is not None and
+            assembler.stats is not self.stats
+        ):
+            self.stats.add(assembler.stats)
+
+        collection_map = self._collection_map
+        for key, indexes in assembler._collection_map.items():
+            if key not in collection_map:
+                collection_map[key] = SortedSet()
+
+            collection_map[key].update(indexes)
+
+        self._touch(assembler._collection_map)
+
+        self._unmatched.extend(assembler._unmatched)
+
+    def collections(self):
+        '''Return list of collections assembled so far.
+
+        The result is cached until more items are fed. The returned
+        :py:class:`~clique.collection.Collection` instances are shared
+        between calls, and continue to be returned by later calls if no items
+        with the same head and tail are fed, so copy them before making any
+        changes.
+
+        '''
+        return list(self._assemble()[0])
+
+    def remainder(self):
+        '''Return list of items not belonging to any collection so far.
+
+        As for :py:meth:`collections`, the result is cached until more items
+        are fed.
+
+        '''
+        return list(self._assemble()[1])
+
+    def _assemble(self):
+        '''Return tuple of (collections, remainder) for current state.'''
+        if self._result is None:
+            self._result = self._form_collections()
+
+        return self._result
+
+    def _flush(self):
+        '''Merge pending indexes into the collection map in bulk.'''
+        if self.stats is not None:
+            self.stats.matches += sum(
+                len(indexes) for indexes in self._pending.values()
+            )
+
+        for key, indexes in self._pending.items():
+            self._collection_map[key].update(indexes)
+
+        self._touch(self._pending)
+        self._pending.clear()
+
+    def _touch(self, keys):
+        '''Record that the collections with *keys* must be formed again.'''
+        keys_map = self._keys
+        dirty = self._dirty
+        for key in keys:
+            group = key[:2]
+            group_keys = keys_map.get(group)
+            if group_keys is None:
+                keys_map[group] = (key,)
+            elif key not in group_keys:
+                keys_map[group] = group_keys + (key,)
+
+            dirty[group] = None
+
+    def _form_collections(self):
+        '''Return tuple of (collections, remainder) from scanned state.'''
+        stats = self.stats
+        if stats is not None:
+            timings = stats.timings
+            mark = _clock()
+
+        self._flush()
+
+        # Only groups changed since the last query are formed again, unless
+        # selecting exclusively, which depends on every collection.
+        if self.exclusive:
+            groups = list(self._keys)
+        else:
+            groups = list(self._dirty)
+
+        self._dirty.clear()
+
+        # Form collections.
+        collection_map = self._collection_map
+        keys_map = self._keys
+        formed = self._formed
+        for group in groups:
+            for key in keys_map[group]:
+                head, tail, padding = key
+                formed[key] = Collection(
+                    head, tail, padding, collection_map[key]
+                )
+
+        if stats is not None:
+            stats.keys += len(collection_map)
+            now = _clock()
+            timings['construct'] += now - mark
+            mark = now
+
+        # Merge together collections that align on padding boundaries. Only
+        # groups with merges are recorded.
+        merges_map = self._merges
+        for group in groups:
+            keys = keys_map[group]
+            if len(keys) > 1:
+                merges = self._merge_padding(keys)
+                if merges:
+                    merges_map[group] = merges
+                else:
+                    merges_map.pop(group, None)
+
+        if stats is not None:
+            stats.merges += sum(self._merges.values())
+            now = _clock()
+            timings['merge'] += now - mark
+            mark = now
+
+        if self.exclusive:
+            collections = [
+                collection for collection in (
+                    formed[key] for key in collection_map
+                )
+                if collection is not None
+            ]
+            filtered, remainder = self._select_exclusive(collections)
+            filtered_count = len(collections) - len(filtered)
         else:
+            filtered, remainder = self._filter(groups)
+            filtered_count = len(self._candidates)
+
+        if stats is not None:
+            stats.filtered += filtered_count
+            stats.collections += len(filtered)
+            stats.remainder += len(remainder)
+            now = _clock()
+            timings['filter'] += now - mark
+            mark = now
+
+        # Set padding for all ambiguous collections according to the
+        # assume_padded_when_ambiguous setting.
+        if self.exclusive:
+            ambiguous = self._resolve_padding(filtered)
+        else:
+            # Only groups with ambiguous collections are recorded.
+            ambiguous_map = self._ambiguous
+            if self.assume_padded_when_ambiguous:
+                membership_map = self._membership_map
+                for head, tail in groups:
+                    tail_map = membership_map.get(head, {})
+                    ambiguous = self._resolve_padding(tail_map.get(tail, ()))
+                    if ambiguous:
+                        ambiguous_map[(head, tail)] = ambiguous
+                    else:
+                        ambiguous_map.pop((head, tail), None)
+
+            ambiguous = sum(ambiguous_map.values())
+
+        if stats is not None:
+            stats.ambiguous += ambiguous
+            timings['padding'] += _clock() - mark
+
+        return filtered, remainder
+
+    def _merge_padding(self, keys):
+        '''Merge collections with *keys* on padding boundaries.
+
+        *keys* should share the same head and tail.
+
+        For example, 0998-0999 and 1000-1001 can be merged into 0998-1001.
+        Note that only indexes within the padding width limit are merged. If
+        the unpadded collection is entirely merged into another then it will
+        not be included as a separate collection in the results.
+
+        Return number of collections merged into.
+
+        '''
+        for unpadded in keys:
+            if unpadded[2] == 0:
+                break
+        else:
+            return 0
+
+        formed = self._formed
+        candidate = formed[unpadded]
+
+        merges = 0
+        fully_merged = False
+        for key in keys:
+            padding = key[2]
+            if padding == 0:
+                continue
+
+            collection = formed[key]
+
+            # Indexes are never negative here so those with a width matching
+            # the padding form a single range.
+            lower = 10 ** (padding - 1)
+            if padding == 1:
+                lower = 0
+            upper = 10 ** padding - 1
+
+            merged_index_count = 0
+            for start, end in candidate.indexes.runs():
+                start = max(start, lower)
+                end = min(end, upper)
+                if start <= end:
+                    collection.indexes.add_range(start, end)
+                    merged_index_count += end - start + 1
+
+            if merged_index_count:
+                merges += 1
+
+            if merged_index_count == len(candidate.indexes):
+                fully_merged = True
+
+        if fully_merged:
+            formed[unpadded] = None
+
+        return merges
+
+    def _filter(self, groups):
+        '''Return tuple of (collections, remainder) after forming *groups*.
+
+        Filter out collections that do not have at least as many indexes as
+        minimum_items. In addition, add any members of a filtered collection,
+        which are not members of an unfiltered collection, to the remainder.
+
+        Only members of filtered collections in *groups*, or that could be
+        members of a collection in *groups*, are checked again.
+
+        '''
+        minimum_items = self.minimum_items
+        formed = self._formed
+        unfiltered_map = self._unfiltered
+        candidates = self._candidates
+        membership_map = self._membership_map
+
+        # Ordered so that the remainder follows the order items were fed in.
+        recheck = OrderedDict()
+        for group in groups:
+            head, tail = group
+            unfiltered = []
+            for key in self._keys[group]:
+                collection = formed[key]
+                candidates.pop(key, None)
+                unfiltered_map.pop(key, None)
+                if collection is None:
+                    continue
+
+                if len(collection.indexes) >= minimum_items:
+                    unfiltered.append(collection)
+                    unfiltered_map[key] = collection
+                else:
+                    members = list(collection)
+                    candidates[key] = members
+                    for member in members:
+                        recheck[member] = None
+
+            # Group unfiltered collections by head and tail so that
+            # membership of a candidate can be checked against only those
+            # collections it could possibly belong to.
+            tail_map = membership_map.get(head)
+            if tail_map is not None:
+                for collection in tail_map.pop(tail, ()):
+                    if _has_partial_digits(collection):
+                        self._partial_digits -= 1
+
+            if unfiltered:
+                if tail_map is None:
+                    tail_map = membership_map[head] = {}
+
+                tail_map[tail] = unfiltered
+                for collection in unfiltered:
+                    if _has_partial_digits(collection):
+                        self._partial_digits += 1
+
+            elif tail_map is not None and not tail_map:
+                del membership_map[head]
+
+        # Unless a head ends, or a tail starts, with digits only whole runs
+        # of digits need to be considered as the index. When that changes,
+        # every candidate must be checked again.
+        checked = self._checked
+        remainder = self._remainder
+        partial = bool(self._partial_digits)
+        if partial != self._partial:
+            self._partial = partial
+            self._watchers = None
+            checked.clear()
+            remainder.clear()
+            for members in candidates.values():
+                for member in members:
+                    recheck[member] = None
+
+        elif checked:
+            # Candidates are only indexed by the groups they could belong to
+            # once needed, so that assembling all items at once never pays
+            # for it.
+            if self._watchers is None:
+                self._watchers = {}
+                self._watch(checked)
+
+            watchers = self._watchers
+            for group in groups:
+                for member in watchers.get(group, ()):
+                    recheck[member] = None
+
+        unchecked = [
+            candidate for candidate in recheck if candidate not in checked
+        ]
+        checked.update(unchecked)
+        if self._watchers is not None:
+            self._watch(unchecked)
+
+        for candidate in recheck:
+            if _has_membership(candidate, membership_map, partial):
+                remainder.pop(candidate, None)
+            else:
+                remainder[candidate] = None
+
+        return (
+            list(unfiltered_map.values()),
+            self._unmatched + list(remainder)
+        )
+
+    def _watch(self, candidates):
+        '''Index *candidates* by each (head, tail) they could belong to.'''
+        watchers = self._watchers
+        if self._partial:
+            for candidate in candidates:
+                for head, _, tail in _split_digits(candidate):
+                    watchers.setdefault((head, tail), set()).add(candidate)
+
+            return
+
+        finditer = _DIGITS_EXPRESSION.finditer
+        for candidate in candidates:
+            for match in finditer(candidate):
+                start, end = match.span()
+                group = (candidate[:start], candidate[end:])
+                members = watchers.get(group)
+                if members is None:
+                    watchers[group] = set([candidate])
+                else:
+                    members.add(candidate)
+
+    def _resolve_padding(self, collections):
+        '''Set padding of ambiguous *collections* and return their number.
+
+        Padding is only set if assume_padded_when_ambiguous is True.
+
+        '''
+        ambiguous = 0
+        if self.assume_padded_when_ambiguous:
+            for collection in collections:
+                if (
+                    not collection.padding and collection.indexes
+                ):
+                    runs = list(collection.indexes.runs())
+                    first_index_width = len(str(runs[0][0]))
+                    last_index_width = len(str(runs[-1][1]))
+                    if first_index_width == last_index_width:
+                        collection.padding = first_index_width
+                        ambiguous += 1
+
+        return ambiguous
+
+    def _select_exclusive(self, collections):
+        '''Return tuple of (collections, remainder) with items in one only.
+
+        Collections are selected greedily, best first, by number of members
+        not already in a selected collection, then by fewest runs of digits
+        in the tail so that the rightmost index is preferred and then by
+        greatest padding so that collections merged on padding boundaries
+        are kept whole. A collection losing members to a better collection
+        is reconsidered with those that remain, which must still number at
+        least minimum_items.
+
+        '''
+        minimum_items = self.minimum_items
+        claimed = set()
+        selected = []
+
+        heap = []
+        for collection in collections:
+            size = len(collection.indexes)
+            if size >= minimum_items:
+                heap.append((
+                    -size, len(_DIGITS_EXPRESSION.findall(collection.tail)),
+                    -collection.padding, collection.head, collection.tail,
+                    collection
+                ))
+
+        heapq.heapify(heap)
+
+        while heap:
+            entry = heapq.heappop(heap)
+            collection = entry[-1]
+            head = collection.head
+            tail = collection.tail
+            padding = collection.padding
+
+            members = []
+            indexes = []
+            for index in collection.indexes:
+                member = '{0}{1:0{2}d}{3}'.format(head, index, padding, tail)
+                if member not in claimed:
+                    members.append(member)
+                    indexes.append(index)
+
+            size = len(indexes)
+            if size < -entry[0]:
+                # Some members were claimed by a better collection since this
+                # one was queued, so queue it again with those remaining.
+                if size >= minimum_items:
+                    heapq.heappush(heap, (-size,) + entry[1:])
+
+                continue
+
+            if size < len(collection.indexes):
+                collection = Collection(head, tail, padding, indexes)
+
+            claimed.update(members)
+            selected.append(collection)
+
+        remainder = list(self._unmatched)
+        seen = set(remainder)
+        seen.update(claimed)
+
+        for collection in collections:
             for member in collection:
-                remainder_candidates.append(member)
+                if member not in seen:
+                    remainder.append(member)
+                    seen.add(member)
+
+        return selected, remainder
+
+
+def _counted(items, stats):
+    '''Yield each of *items*, counting them in *stats*.'''
+    for item in items:
+        stats.items += 1
+        yield item
+
+
+def _has_membership(item, membership_map, partial=True):
+    '''Return whether *item* is a member of a collection in *membership_map*.
+
+    *membership_map* should map head to tail to a list of collections. Only
+    collections whose head and tail surround a run of digits in *item* are
+    checked for membership. *partial* has the same meaning as for
+    :py:func:`_split_digits`.
+
+    '''
+    for head, _, tail in _split_digits(item, partial, membership_map):
+        for collection in membership_map[head].get(tail, ()):
+            if item in collection:
+                return True
+
+    return False
+
+
+def _split_digits(item, partial=True, heads=None):
+    '''Yield (head, index, tail) for each split of *item* around digits.
+
+    Each run of digits in *item* is considered as the index in turn. If
+    *partial* is True, every part of a run is also considered, so that a head
+    may end, or a tail start, with digits.
+
+    If *heads* is given, only splits with a head in *heads* are yielded and
+    the index and tail of other splits are never sliced.
+
+    '''
+    for match in _DIGITS_EXPRESSION.finditer(item):
+        start, end = match.span()
+        if not partial:
+            head = item[:start]
+            if heads is None or head in heads:
+                yield head, match.group(), item[end:]
 
-    for candidate in remainder_candidates:
-        # Check if candidate has already been added to remainder to avoid
-        # duplicate entries.
-        if candidate in remainder:
             continue
 
-        has_membership = False
+        for index_start in range(start, end):
+            head = item[:index_start]
+            if heads is not None and head not in heads:
+                continue
 
-        for collection in filtered:
-            if candidate in collection:
-                has_membership = True
-                break
+            for index_end in range(index_start + 1, end + 1):
+                yield head, item[index_start:index_end], item[index_end:]
 
-        if not has_membership:
-            remainder.append(candidate)
 
-    # Set padding for all ambiguous collections according to the
-    # assume_padded_when_ambiguous setting.
-    if assume_padded_when_ambiguous:
-        for collection in filtered:
-            if (
-                not collection.padding and collection.indexes
-            ):
-                indexes = list(collection.indexes)
-                first_index_width = len(str(indexes[0]))
-                last_index_width = len(str(indexes[-1]))
-                if first_index_width == last_index_width:
-                    collection.padding = first_index_width
+def _has_partial_digits(collection):
+    '''Return whether *collection* has digits adjacent to its index.'''
+    match = _DIGITS_EXPRESSION.match
+    return bool(
+        match(collection.head[-1:]) or match(collection.tail[:1])
+    )
+
+
+def _compile_parse_pattern(pattern):
+    '''Return compiled expression for parse *pattern*.'''
+    # Construct regular expression for given pattern.
+    expressions = {
+        'head': '(?P<head>.*)',
+        'tail': '(?P<tail>.*)',
+        'padding': r'%(?P<padding>\d*)d',
+        'range': r'(?P<range>\d+-\d+)?',
+        'ranges': r'(?P<ranges>[\d ,\-]+)?',
+        'holes': r'(?P<holes>[\d ,\-]+)'
+    }
+
+    pattern_regex = re.escape(pattern)
+    for key, expression in expressions.items():
+        pattern_regex = pattern_regex.replace(
+            r'\{{{0}\}}'.format(key),
+            expression
+        )
+    pattern_regex = '^{0}$'.format(pattern_regex)
 
-    return filtered, remainder
+    return re.compile(pattern_regex)
 
 
 def parse(value, pattern='{head}{padding}{tail} [{ranges}]'):
@@ -221,29 +891,60 @@ def parse(value, pattern='{head}{padding}{tail} [{ranges}]'):
 
     .. note::
 
-        *holes* only makes sense if *range* or *ranges* is also present.
+        *holes* only makes sense if *range* or *ranges* is also present. Any
+        holes outside of those ranges are ignored.
+
+    Ranges are stored without expanding each index, so parsing a large range
+    such as ``[1-5000000]`` is fast and uses little memory.
 
     '''
-    # Construct regular expression for given pattern.
-    expressions = {
-        'head': '(?P<head>.*)',
-        'tail': '(?P<tail>.*)',
-        'padding': '%(?P<padding>\d*)d',
-        'range': '(?P<range>\d+-\d+)?',
-        'ranges': '(?P<ranges>[\d ,\-]+)?',
-        'holes': '(?P<holes>[\d ,\-]+)'
-    }
+    expression = parse_cache.get(pattern, _compile_parse_pattern)
+    return _parse(value, expression)
 
-    pattern_regex = re.escape(pattern)
-    for key, expression in expressions.items():
-        pattern_regex = pattern_regex.replace(
-            '\{{{0}\}}'.format(key),
-            expression
-        )
-    pattern_regex = '^{0}$'.format(pattern_regex)
 
+def parse_many(
+    values, pattern='{head}{padding}{tail} [{ranges}]', on_error=None
+):
+    '''Parse each of *values* into a :py:class:`~clique.collection.Collection`.
+
+    *pattern* is compiled once and used for all *values*. See
+    :py:func:`parse` for the supported keys.
+
+    Return a generator yielding a collection for each value in turn.
+
+    By default, a value that cannot be parsed raises a :py:exc:`ValueError`
+    and stops the generator. To continue past errors instead, pass a callable
+    as *on_error*. It will be called with the failing value and the exception
+    raised, and no collection is yielded for that value::
+
+        >>> errors = []
+        >>> collections = list(clique.parse_many(
+        ...     ['file.%04d.jpg [1-3]', 'invalid', 'file.%d.exr [1, 3]'],
+        ...     on_error=lambda value, error: errors.append(value)
+        ... ))
+        >>> print errors
+        ['invalid']
+
+    '''
+    expression = parse_cache.get(pattern, _compile_parse_pattern)
+
+    for value in values:
+        try:
+            collection = _parse(value, expression)
+        except ValueError as error:
+            if on_error is None:
+                raise
+
+            on_error(value, error)
+            continue
+
+        yield collection
+
+
+def _parse(value, expression):
+    '''Parse *value* using compiled parse *expression*.'''
     # Match pattern against value and use results to construct collection.
-    match = re.search(pattern_regex, value)
+    match = expression.search(value)
     if match is None:
         raise ValueError('Value did not match pattern.')
 
@@ -262,7 +963,7 @@ def parse(value, pattern='{head}{padding}{tail} [{ranges}]'):
 
     if groups.get('range', None) is not None:
         start, end = map(int, groups['range'].split('-'))
-        collection.indexes.update(range(start, end + 1))
+        collection.indexes.add_range(start, end)
 
     if groups.get('ranges', None) is not None:
         parts = [part.strip() for part in groups['ranges'].split(',')]
@@ -271,8 +972,7 @@ def parse(value, pattern='{head}{padding}{tail} [{ranges}]'):
 
             if len(index_range) > 1:
                 # Index range.
-                for index in range(index_range[0], index_range[1] + 1):
-                    collection.indexes.add(index)
+                collection.indexes.add_range(index_range[0], index_range[1])
             else:
                 # Single index.
                 collection.indexes.add(index_range[0])
@@ -280,14 +980,15 @@ def parse(value, pattern='{head}{padding}{tail} [{ranges}]'):
     if 'holes' in groups:
         parts = [part.strip() for part in groups['holes'].split(',')]
         for part in parts:
-            index_range = map(int, part.split('-', 2))
+            index_range = list(map(int, part.split('-', 2)))
 
             if len(index_range) > 1:
                 # Index range.
-                for index in range(index_range[0], index_range[1] + 1):
-                    collection.indexes.remove(index)
+                collection.indexes.discard_range(
+                    index_range[0], index_range[1]
+                )
             else:
                 # Single index.
-                collection.indexes.remove(index_range[0])
+                collection.indexes.discard(index_range[0])
 
     return collection
@@ -0,0 +1,114 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Assemble items without blocking an :py:mod:`asyncio` event loop.
+
+Assembly is CPU bound, so calling :py:func:`clique.assemble` on a large
+listing from a coroutine blocks the event loop until it completes. The
+functions in this module instead consume items in batches and perform the
+work for each batch in an executor, leaving the loop free to run other tasks
+in between.
+
+.. note::
+
+    This module requires Python 3.6 or later.
+
+'''
+
+import asyncio
+
+import clique
+import clique.filesystem
+
+
+async def assemble(iterable, batch_size=10000, executor=None, **kw):
+    '''Assemble items in *iterable* without blocking the event loop.
+
+    *iterable* may be an asynchronous iterable or a regular iterable. Items
+    are collected into batches of *batch_size* and each batch is fed to an
+    :py:class:`~clique.Assembler` in *executor*, which defaults to the
+    default executor of the running loop.
+
+    Any additional keyword arguments are passed to
+    :py:class:`~clique.Assembler`.
+
+    Return tuple of two lists (collections, remainder) as for
+    :py:func:`clique.assemble`::
+
+        >>> collections, remainder = await clique.aio.assemble(items)
+
+    '''
+    loop = asyncio.get_event_loop()
+    assembler = clique.Assembler(**kw)
+
+    batch = []
+    async for item in _iterate(iterable):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            await loop.run_in_executor(executor, assembler.feed, batch)
+            batch = []
+
+    if batch:
+        await loop.run_in_executor(executor, assembler.feed, batch)
+
+    return await loop.run_in_executor(executor, _result, assembler)
+
+
+async def scan(
+    path, recursive=False, executor=None, filter=None, follow_symlinks=False,
+    include_hidden=True, stat=False, onerror=None, **kw
+):
+    '''Yield :py:class:`~clique.filesystem.ScanResult` for each directory.
+
+    Equivalent to :py:func:`clique.scan` but as an asynchronous generator,
+    with each directory listed and assembled in *executor* so that the event
+    loop is not blocked::
+
+        >>> async for result in clique.aio.scan(path, recursive=True):
+        ...     print(result.path, result.collections)
+
+    *executor* defaults to the default executor of the running loop. All
+    other arguments have the same meaning as for :py:func:`clique.scan`.
+
+    '''
+    loop = asyncio.get_event_loop()
+    options = dict(
+        filter=filter, follow_symlinks=follow_symlinks,
+        include_hidden=include_hidden, stat=stat
+    )
+
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        try:
+            result, subdirectories = await loop.run_in_executor(
+                executor, clique.filesystem._scan_directory,
+                directory, options, kw, recursive
+            )
+        except OSError as error:
+            if onerror is not None:
+                onerror(error)
+            continue
+
+        yield result
+
+        if recursive:
+            # Reverse so that subdirectories are scanned in listing order.
+            pending.extend(reversed(subdirectories))
+
+
+async def _iterate(iterable):
+    '''Yield items from asynchronous or regular *iterable*.'''
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+
+    else:
+        for item in iterable:
+            yield item
+
+
+def _result(assembler):
+    '''Return assembled collections and remainder from *assembler*.'''
+    return assembler.collections(), assembler.remainder()
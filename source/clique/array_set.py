@@ -0,0 +1,341 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Index storage backed by NumPy arrays.
+
+NumPy is an optional dependency. Use :py:func:`preferred_storage` to select
+:py:class:`ArraySortedSet` when NumPy is available and fall back to
+:py:class:`~clique.sorted_set.SortedSet` otherwise::
+
+    >>> collection = clique.Collection(
+    ...     'file.', '.exr', 4, storage=clique.array_set.preferred_storage()
+    ... )
+
+'''
+
+try:
+    from collections.abc import MutableSet, Set
+except ImportError:
+    from collections import MutableSet, Set
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import clique.sorted_set
+
+
+def preferred_storage():
+    '''Return best available class for storing indexes.
+
+    Return :py:class:`ArraySortedSet` if NumPy is available, otherwise
+    :py:class:`~clique.sorted_set.SortedSet`.
+
+    '''
+    if numpy is None:
+        return clique.sorted_set.SortedSet
+
+    return ArraySortedSet
+
+
+def to_array(iterable):
+    '''Return sorted array of unique integers from *iterable*.
+
+    *iterable* may be an :py:class:`ArraySortedSet` (returned without
+    copying), a :py:class:`~clique.sorted_set.SortedSet` (expanded run by
+    run), an array or any iterable of integers.
+
+    raise :py:exc:`ImportError` if NumPy is not available.
+
+    '''
+    if numpy is None:
+        raise ImportError('NumPy is required to create index arrays.')
+
+    if isinstance(iterable, ArraySortedSet):
+        return iterable.array()
+
+    if isinstance(iterable, clique.sorted_set.SortedSet):
+        ranges = [
+            numpy.arange(start, end + 1, dtype=numpy.int64)
+            for start, end in iterable.runs()
+        ]
+        if not ranges:
+            return numpy.empty(0, dtype=numpy.int64)
+
+        return numpy.concatenate(ranges)
+
+    if not isinstance(iterable, numpy.ndarray):
+        iterable = numpy.fromiter(iterable, dtype=numpy.int64)
+
+    return numpy.unique(iterable.astype(numpy.int64, copy=False))
+
+
+class ArraySortedSet(clique.sorted_set._MutableSet):
+    '''Maintain sorted collection of unique integers in a NumPy array.
+
+    Members are held in a sorted int64 array. Lookups use binary search and
+    bulk operations, such as :py:meth:`update` and the set operators, are
+    vectorised. Adding or discarding a single item copies the array, so
+    prefer bulk operations where possible.
+
+    '''
+
+    __slots__ = ('_members', '_revision')
+
+    def __init__(self, iterable=None):
+        '''Initialise with items from *iterable*.
+
+        raise :py:exc:`ImportError` if NumPy is not available.
+
+        '''
+        if numpy is None:
+            raise ImportError('NumPy is required for ArraySortedSet.')
+
+        super(ArraySortedSet, self).__init__()
+        self._members = numpy.empty(0, dtype=numpy.int64)
+        self._revision = 0
+        if iterable is not None:
+            self.update(iterable)
+
+    @classmethod
+    def _from_array(cls, members):
+        '''Return new set using sorted, unique *members* array directly.'''
+        instance = cls()
+        instance._members = members
+        return instance
+
+    def __getstate__(self):
+        '''Return state for pickling.'''
+        return (self._members,)
+
+    def __setstate__(self, state):
+        '''Restore from pickled *state*.'''
+        self._members, = state
+        self._revision = 0
+
+    def __str__(self):
+        '''Return string representation.'''
+        return str(list(self))
+
+    def __repr__(self):
+        '''Return representation.'''
+        return '<{0} "{1}">'.format(self.__class__.__name__, self)
+
+    def __contains__(self, item):
+        '''Return whether *item* is present.'''
+        members = self._members
+        index = numpy.searchsorted(members, item)
+        return index < len(members) and members[index] == item
+
+    def __len__(self):
+        '''Return number of items.'''
+        return len(self._members)
+
+    def __iter__(self):
+        '''Return iterator over items.'''
+        return iter(self._members.tolist())
+
+    def __eq__(self, other):
+        '''Return whether *other* set is equal.'''
+        if isinstance(other, ArraySortedSet):
+            return numpy.array_equal(self._members, other._members)
+
+        return super(ArraySortedSet, self).__eq__(other)
+
+    def __ne__(self, other):
+        '''Return whether *other* set is not equal.'''
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+
+        return not result
+
+    def array(self):
+        '''Return read only view of the sorted member array.
+
+        No copy is made, so the view reflects the members at the time of the
+        call only as long as the set is not modified.
+
+        '''
+        view = self._members.view()
+        view.flags.writeable = False
+        return view
+
+    def runs(self):
+        '''Return iterator over contiguous runs of items.
+
+        Each run is an inclusive (start, end) tuple and runs are returned in
+        ascending order.
+
+        '''
+        members = self._members
+        if not len(members):
+            return iter([])
+
+        breaks = numpy.flatnonzero(numpy.diff(members) != 1)
+        starts = members[numpy.concatenate(([0], breaks + 1))]
+        ends = members[numpy.concatenate((breaks, [len(members) - 1]))]
+        return iter(zip(starts.tolist(), ends.tolist()))
+
+    def add(self, item):
+        '''Add *item*.'''
+        members = self._members
+        index = numpy.searchsorted(members, item)
+        if index < len(members) and members[index] == item:
+            return
+
+        self._members = numpy.insert(members, index, item)
+        self._revision += 1
+
+    def add_range(self, start, end):
+        '''Add all items from *start* to *end* inclusive.'''
+        if end < start:
+            return
+
+        # Splice the range in place of any members it covers rather than
+        # merging the whole array.
+        members = self._members
+        low = numpy.searchsorted(members, start, side='left')
+        high = numpy.searchsorted(members, end, side='right')
+        if high - low == end - start + 1:
+            return
+
+        self._members = numpy.concatenate((
+            members[:low],
+            numpy.arange(start, end + 1, dtype=numpy.int64),
+            members[high:]
+        ))
+        self._revision += 1
+
+    def discard(self, item):
+        '''Remove *item*.'''
+        members = self._members
+        index = numpy.searchsorted(members, item)
+        if index < len(members) and members[index] == item:
+            self._members = numpy.delete(members, index)
+            self._revision += 1
+
+    def discard_range(self, start, end):
+        '''Remove all items from *start* to *end* inclusive.'''
+        if end < start:
+            return
+
+        members = self._members
+        low = numpy.searchsorted(members, start, side='left')
+        high = numpy.searchsorted(members, end, side='right')
+        if low < high:
+            self._members = numpy.concatenate(
+                (members[:low], members[high:])
+            )
+            self._revision += 1
+
+    def clear(self):
+        '''Remove all items.'''
+        self._members = numpy.empty(0, dtype=numpy.int64)
+        self._revision += 1
+
+    def update(self, iterable):
+        '''Update items with those from *iterable*.
+
+        Items that all follow the existing members are appended directly
+        rather than merged.
+
+        '''
+        other = to_array(iterable)
+        if not len(other):
+            return
+
+        members = self._members
+        if not len(members) or other[0] > members[-1]:
+            self._members = numpy.concatenate((members, other))
+        else:
+            self._members = numpy.union1d(members, other)
+
+        self._revision += 1
+
+    def difference_update(self, iterable):
+        '''Remove items present in *iterable*.'''
+        other = to_array(iterable)
+        if not len(other) or not len(self._members):
+            return
+
+        self._members = numpy.setdiff1d(
+            self._members, other, assume_unique=True
+        )
+        self._revision += 1
+
+    def intersection_update(self, iterable):
+        '''Keep only items also present in *iterable*.'''
+        self._members = numpy.intersect1d(
+            self._members, to_array(iterable), assume_unique=True
+        )
+        self._revision += 1
+
+    def symmetric_difference_update(self, iterable):
+        '''Keep only items present in either this set or *iterable*.'''
+        self._members = numpy.setxor1d(
+            self._members, to_array(iterable), assume_unique=True
+        )
+        self._revision += 1
+
+    def __or__(self, other):
+        '''Return union with *other* set.'''
+        if not isinstance(other, Set):
+            return NotImplemented
+
+        return self._from_array(numpy.union1d(self._members, to_array(other)))
+
+    def __and__(self, other):
+        '''Return intersection with *other* set.'''
+        if not isinstance(other, Set):
+            return NotImplemented
+
+        return self._from_array(
+            numpy.intersect1d(
+                self._members, to_array(other), assume_unique=True
+            )
+        )
+
+    def __sub__(self, other):
+        '''Return difference with *other* set.'''
+        if not isinstance(other, Set):
+            return NotImplemented
+
+        return self._from_array(
+            numpy.setdiff1d(self._members, to_array(other), assume_unique=True)
+        )
+
+    def __xor__(self, other):
+        '''Return symmetric difference with *other* set.'''
+        if not isinstance(other, Set):
+            return NotImplemented
+
+        return self._from_array(
+            numpy.setxor1d(self._members, to_array(other), assume_unique=True)
+        )
+
+    def __ior__(self, other):
+        '''Update with union of *other* set.'''
+        self.update(other)
+        return self
+
+    def __iand__(self, other):
+        '''Update with intersection of *other* set.'''
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other):
+        '''Update with difference of *other* set.'''
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other):
+        '''Update with symmetric difference of *other* set.'''
+        self.symmetric_difference_update(other)
+        return self
+
+
+if clique.sorted_set._MutableSet is not MutableSet:
+    MutableSet.register(ArraySortedSet)
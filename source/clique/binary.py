@@ -0,0 +1,355 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Compact binary encoding of collections.
+
+Each collection is encoded as its head, tail and padding followed by its
+indexes as contiguous runs. Runs are delta encoded and all integers are
+written as variable length integers, so a collection costs only a few bytes
+per run regardless of how many indexes it holds. When streaming many
+collections, the head and tail only store the part that differs from the
+previous collection, which is typically small when sorted::
+
+    >>> data = clique.binary.to_bytes(collection)
+    >>> collection == clique.binary.from_bytes(data)
+    True
+
+Use :py:class:`Writer` and :py:class:`Reader` to store many collections in a
+single stream, such as a file.
+
+'''
+
+import os
+
+import clique.collection
+import clique.sorted_set
+
+try:
+    _text_type = unicode
+except NameError:
+    _text_type = str
+
+
+#: Leading bytes identifying encoded data.
+MAGIC = b'CLQ'
+
+#: Version of the encoding written.
+VERSION = 1
+
+_HEADER = bytes(bytearray(MAGIC) + bytearray([VERSION]))
+
+
+def to_bytes(collection):
+    '''Return *collection* encoded as bytes.'''
+    return _HEADER + encode(collection)
+
+
+def from_bytes(data, storage=None):
+    '''Return collection decoded from *data*.
+
+    *storage* is passed to the :py:class:`~clique.collection.Collection`
+    created.
+
+    raise :py:exc:`ValueError` if *data* is not a valid encoding.
+
+    '''
+    data = bytearray(data)
+    _check_header(data)
+
+    collection, offset = decode(data, len(_HEADER), storage=storage)
+    if offset != len(data):
+        raise ValueError('Unexpected data after encoded collection.')
+
+    return collection
+
+
+def encode(collection, previous=None):
+    '''Return *collection* encoded as a record without a header.
+
+    If *previous* collection is given, only the parts of the head and tail
+    that differ from it are stored and the same *previous* collection must be
+    given when decoding.
+
+    Records are the building block of the other formats and are only
+    meaningful alongside a header identifying the version used.
+
+    '''
+    data = bytearray()
+    for value, previous_value in zip(
+        _encoded_parts(collection), _encoded_parts(previous)
+    ):
+        shared = len(os.path.commonprefix([value, previous_value]))
+        _write_varint(data, shared)
+        _write_varint(data, len(value) - shared)
+        data.extend(value[shared:])
+
+    _write_varint(data, collection.padding)
+
+    runs = list(collection.indexes.runs())
+    _write_varint(data, len(runs))
+
+    # Store the first start, zigzag encoded in case it is negative, and then
+    # the gap between runs and the length of each run. As runs are sorted and
+    # never adjacent, all of these are small non-negative integers.
+    previous_end = None
+    for start, end in runs:
+        if previous_end is None:
+            if start < 0:
+                _write_varint(data, -start * 2 - 1)
+            else:
+                _write_varint(data, start * 2)
+        else:
+            _write_varint(data, start - previous_end - 2)
+
+        _write_varint(data, end - start)
+        previous_end = end
+
+    return bytes(data)
+
+
+def decode(data, offset=0, storage=None, previous=None):
+    '''Return (collection, offset) for record in *data* from *offset*.
+
+    *data* should be a :py:class:`bytearray` and the returned offset is that
+    of the first byte after the record. *storage* is passed to the
+    :py:class:`~clique.collection.Collection` created. *previous* must be the
+    collection given when the record was encoded, if any.
+
+    raise :py:exc:`ValueError` if *data* does not contain a valid record at
+    *offset*.
+
+    '''
+    try:
+        parts = []
+        for previous_value in _encoded_parts(previous):
+            shared, offset = _read_varint(data, offset)
+            size, offset = _read_varint(data, offset)
+            end = offset + size
+            if end > len(data) or shared > len(previous_value):
+                raise IndexError()
+
+            parts.append(
+                _decode_text(previous_value[:shared] + bytes(data[offset:end]))
+            )
+            offset = end
+
+        padding, offset = _read_varint(data, offset)
+        count, offset = _read_varint(data, offset)
+
+        runs = []
+        previous_end = None
+        for _ in range(count):
+            value, offset = _read_varint(data, offset)
+            if previous_end is None:
+                if value & 1:
+                    start = -(value + 1) // 2
+                else:
+                    start = value // 2
+            else:
+                start = previous_end + value + 2
+
+            length, offset = _read_varint(data, offset)
+            previous_end = start + length
+            runs.append((start, previous_end))
+
+    except IndexError:
+        raise ValueError('Encoded collection is truncated.')
+
+    head, tail = parts
+    collection = clique.collection.Collection(
+        head, tail, padding, storage=storage
+    )
+    collection.indexes.update(clique.sorted_set.SortedSet._from_runs(runs))
+    return collection, offset
+
+
+class Writer(object):
+    '''Write many collections to a binary stream.
+
+    Example::
+
+        >>> with open('catalogue.clq', 'wb') as stream:
+        ...     writer = Writer(stream)
+        ...     for collection in collections:
+        ...         writer.write(collection)
+
+    '''
+
+    def __init__(self, stream):
+        '''Initialise writer for *stream* and write header to it.
+
+        *stream* should be a file-like object opened for writing bytes.
+
+        '''
+        super(Writer, self).__init__()
+        self.stream = stream
+        self.stream.write(_HEADER)
+        self._previous = None
+
+    def write(self, collection):
+        '''Write *collection* to stream.
+
+        Collections sorted by head are stored most compactly.
+
+        '''
+        record = encode(collection, previous=self._previous)
+        self._previous = collection
+
+        data = bytearray()
+        _write_varint(data, len(record))
+        data.extend(record)
+        self.stream.write(bytes(data))
+
+    def write_many(self, collections):
+        '''Write each of *collections* to stream.'''
+        for collection in collections:
+            self.write(collection)
+
+
+class Reader(object):
+    '''Read collections written by :py:class:`Writer` from a binary stream.
+
+    Iterate over the reader to retrieve each collection in turn::
+
+        >>> with open('catalogue.clq', 'rb') as stream:
+        ...     for collection in Reader(stream):
+        ...         print collection
+
+    '''
+
+    def __init__(self, stream, storage=None):
+        '''Initialise reader for *stream* and read header from it.
+
+        *stream* should be a file-like object opened for reading bytes.
+        *storage* is passed to each :py:class:`~clique.collection.Collection`
+        created.
+
+        raise :py:exc:`ValueError` if *stream* does not start with a valid
+        header.
+
+        '''
+        super(Reader, self).__init__()
+        self.stream = stream
+        self.storage = storage
+        self._previous = None
+        _check_header(bytearray(self.stream.read(len(_HEADER))))
+
+    def __iter__(self):
+        '''Return iterator over remaining collections.'''
+        while True:
+            collection = self.read()
+            if collection is None:
+                return
+
+            yield collection
+
+    def read(self):
+        '''Return next collection or None if no collections remain.
+
+        raise :py:exc:`ValueError` if the stream ends part way through a
+        collection.
+
+        '''
+        size = 0
+        shift = 0
+        while True:
+            byte = bytearray(self.stream.read(1))
+            if not byte:
+                if shift:
+                    raise ValueError('Encoded collection is truncated.')
+
+                return None
+
+            size |= (byte[0] & 0x7f) << shift
+            shift += 7
+            if not byte[0] & 0x80:
+                break
+
+        record = bytearray(self.stream.read(size))
+        if len(record) != size:
+            raise ValueError('Encoded collection is truncated.')
+
+        collection, offset = decode(
+            record, storage=self.storage, previous=self._previous
+        )
+        if offset != size:
+            raise ValueError('Encoded collection has unexpected length.')
+
+        self._previous = collection
+        return collection
+
+
+def _check_header(data):
+    '''Raise :py:exc:`ValueError` if *data* does not start with header.'''
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('Data is not an encoded collection.')
+
+    if len(data) < len(_HEADER):
+        raise ValueError('Encoded collection is truncated.')
+
+    version = data[len(MAGIC)]
+    if version != VERSION:
+        raise ValueError(
+            'Unsupported encoding version {0}.'.format(version)
+        )
+
+
+def _encoded_parts(collection):
+    '''Return UTF-8 encoded head and tail of *collection*.
+
+    Return empty parts if *collection* is None.
+
+    '''
+    if collection is None:
+        return b'', b''
+
+    return _encode_text(collection.head), _encode_text(collection.tail)
+
+
+def _encode_text(value):
+    '''Return *value* encoded as UTF-8 bytes.'''
+    if isinstance(value, _text_type):
+        return value.encode('utf-8')
+
+    return value
+
+
+def _write_varint(data, value):
+    '''Append non-negative integer *value* to *data* as a varint.'''
+    while value > 0x7f:
+        data.append((value & 0x7f) | 0x80)
+        value >>= 7
+
+    data.append(value)
+
+
+def _read_varint(data, offset):
+    '''Return (value, offset) for varint in *data* at *offset*.'''
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, offset
+
+        shift += 7
+
+
+def _decode_text(data):
+    '''Return string for UTF-8 encoded *data*.
+
+    Under Python 2, ASCII *data* is returned as a byte string so that it
+    compares equal to the original value.
+
+    '''
+    text = data.decode('utf-8')
+    if _text_type is not str:
+        try:
+            return text.encode('ascii')
+        except UnicodeEncodeError:
+            pass
+
+    return text
@@ -0,0 +1,80 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Bounded caches for expensive values such as compiled expressions.'''
+
+import collections
+import threading
+
+
+#: Statistics for a :py:class:`LruCache`.
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize']
+)
+
+
+class LruCache(object):
+    '''Cache values, discarding the least recently used when full.
+
+    Example::
+
+        >>> cache = LruCache(maxsize=2)
+        >>> cache.get('a', str.upper)
+        'A'
+        >>> cache.get('a', str.upper)
+        'A'
+        >>> cache.info()
+        CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+
+    '''
+
+    def __init__(self, maxsize=128):
+        '''Initialise cache holding at most *maxsize* values.'''
+        super(LruCache, self).__init__()
+        self.maxsize = maxsize
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, factory):
+        '''Return value for *key*, computing it with *factory* if missing.
+
+        *factory* will be called with *key* as its only argument and its
+        result stored in the cache.
+
+        '''
+        with self._lock:
+            try:
+                value = self._values.pop(key)
+            except KeyError:
+                pass
+            else:
+                self._values[key] = value
+                self._hits += 1
+                return value
+
+        value = factory(key)
+
+        with self._lock:
+            self._misses += 1
+            self._values[key] = value
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+
+        return value
+
+    def info(self):
+        '''Return :py:data:`CacheInfo` with current statistics.'''
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self.maxsize, len(self._values)
+            )
+
+    def clear(self):
+        '''Remove all values and reset statistics.'''
+        with self._lock:
+            self._values.clear()
+            self._hits = 0
+            self._misses = 0
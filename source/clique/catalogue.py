@@ -0,0 +1,308 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Read only catalogue of many collections stored in a single file.
+
+A catalogue is written once with :py:func:`write` and then opened with
+:py:class:`Catalogue`, which maps the file into memory rather than reading it.
+Collections are only decoded when looked up, so opening even a very large
+catalogue is immediate and several processes opening the same file share a
+single copy of it through the operating system::
+
+    >>> clique.catalogue.write('show.clqc', collections)
+    >>> with clique.catalogue.Catalogue('show.clqc') as catalogue:
+    ...     print catalogue.contains('/path/to/file.0001.exr')
+    True
+
+The file starts with a header, followed by a table of fixed size entries
+locating each collection and then the collections themselves, encoded as for
+:py:mod:`clique.binary`. The table is sorted by a hash of the head, tail and
+padding of each collection so that lookups only need to binary search the
+table and then decode the single matching collection.
+
+'''
+
+import bisect
+import hashlib
+import mmap
+import struct
+
+import clique
+import clique.binary
+import clique.cache
+
+
+#: Leading bytes identifying a catalogue file.
+MAGIC = b'CLQCAT'
+
+#: Version of the catalogue format written.
+VERSION = 1
+
+#: Header flag set when no collection has a head ending, or tail starting,
+#: with a digit.
+_WHOLE_DIGITS = 1
+
+_HEADER = struct.Struct('<{0}sBBQ'.format(len(MAGIC)))
+_ENTRY = struct.Struct('<QQI')
+
+
+def write(path, collections):
+    '''Write catalogue of *collections* to file at *path*.
+
+    Collections with the same head, tail and padding are merged into a single
+    collection in the catalogue.
+
+    '''
+    merged = {}
+    for collection in collections:
+        key = _key(collection.head, collection.tail, collection.padding)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = collection
+        else:
+            merged[key] = existing.union(collection)
+
+    flags = _WHOLE_DIGITS
+    entries = []
+    records = []
+    offset = 0
+    for key in sorted(merged):
+        collection = merged[key]
+        if (
+            _ends_with_digit(collection.head) or
+            _starts_with_digit(collection.tail)
+        ):
+            flags &= ~_WHOLE_DIGITS
+
+        record = clique.binary.encode(collection)
+        entries.append((_hash(key), offset, len(record)))
+        records.append(record)
+        offset += len(record)
+
+    entries.sort()
+
+    with open(path, 'wb') as stream:
+        stream.write(_HEADER.pack(MAGIC, VERSION, flags, len(records)))
+
+        for entry in entries:
+            stream.write(_ENTRY.pack(*entry))
+
+        for record in records:
+            stream.write(record)
+
+
+class Catalogue(object):
+    '''Memory mapped catalogue of collections written by :py:func:`write`.'''
+
+    def __init__(self, path, cache_size=128, storage=None):
+        '''Open catalogue at *path*.
+
+        Up to *cache_size* recently used collections are kept decoded to
+        speed up repeated membership tests. *storage* is passed to each
+        :py:class:`~clique.collection.Collection` created.
+
+        raise :py:exc:`ValueError` if *path* is not a valid catalogue.
+
+        '''
+        super(Catalogue, self).__init__()
+        self.path = path
+        self.storage = storage
+        self._cache = clique.cache.LruCache(maxsize=cache_size)
+
+        with open(path, 'rb') as stream:
+            header = stream.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError('File is not a collection catalogue.')
+
+            magic, version, flags, count = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError('File is not a collection catalogue.')
+
+            if version != VERSION:
+                raise ValueError(
+                    'Unsupported catalogue version {0}.'.format(version)
+                )
+
+            self._map = mmap.mmap(
+                stream.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        self._count = count
+        self._whole_digits = bool(flags & _WHOLE_DIGITS)
+        self._hashes = _Hashes(self._map, count)
+        self._records_offset = _HEADER.size + count * _ENTRY.size
+        if len(self._map) < self._records_offset:
+            self.close()
+            raise ValueError('Catalogue is truncated.')
+
+    def __enter__(self):
+        '''Return catalogue for use as context manager.'''
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        '''Close catalogue on leaving context.'''
+        self.close()
+
+    def __len__(self):
+        '''Return number of collections in catalogue.'''
+        return self._count
+
+    def __iter__(self):
+        '''Return iterator over all collections in catalogue.
+
+        Collections are decoded one at a time in order of head, tail and
+        padding.
+
+        '''
+        entries = sorted(
+            self._entry(position)[1:] for position in range(self._count)
+        )
+        for offset, length in entries:
+            yield self._decode(self._records_offset + offset, length)
+
+    def close(self):
+        '''Close catalogue, releasing the mapped file.'''
+        self._map.close()
+
+    def lookup(self, head, tail, padding):
+        '''Return collection with *head*, *tail* and *padding* or None.
+
+        A new collection is decoded for each call so may be freely modified.
+
+        '''
+        record = self._find(_key(head, tail, padding))
+        if record is None:
+            return None
+
+        return self._decode(*record)
+
+    def contains(self, item):
+        '''Return whether *item* is a member of a collection in catalogue.'''
+        # Unless a head ends, or a tail starts, with digits only the whole
+        # run of digits can be an index.
+        splits = clique._split_digits(item, partial=not self._whole_digits)
+        for head, index, tail in splits:
+            if len(index) > 1 and index[0] == '0':
+                paddings = (len(index),)
+            else:
+                paddings = (0, len(index))
+
+            for padding in paddings:
+                record = self._find(_key(head, tail, padding))
+                if record is None:
+                    continue
+
+                collection = self._cache.get(record, self._decode_record)
+                if int(index) in collection.indexes:
+                    return True
+
+        return False
+
+    def _find(self, key):
+        '''Return (offset, length) of record with *key* or None.'''
+        key_hash = _hash(key)
+        position = bisect.bisect_left(self._hashes, key_hash)
+        while position < self._count:
+            entry_hash, offset, length = self._entry(position)
+            if entry_hash != key_hash:
+                break
+
+            offset += self._records_offset
+            if self._read_key(offset, length) == key:
+                return offset, length
+
+            position += 1
+
+        return None
+
+    def _entry(self, position):
+        '''Return (hash, offset, length) of entry at *position*.'''
+        return _ENTRY.unpack_from(
+            self._map, _HEADER.size + position * _ENTRY.size
+        )
+
+    def _read_key(self, offset, length):
+        '''Return key of record at *offset* without decoding its indexes.'''
+        end = offset + length
+
+        parts = []
+        for _ in range(2):
+            # The shared prefix is always empty for records in a catalogue.
+            _, offset = self._read_varint(offset)
+            size, offset = self._read_varint(offset)
+            parts.append(self._map[offset:min(offset + size, end)])
+            offset += size
+
+        padding, _ = self._read_varint(offset)
+        return parts[0], parts[1], padding
+
+    def _read_varint(self, offset):
+        '''Return (value, offset) for varint in map at *offset*.'''
+        data = bytearray(self._map[offset:offset + 10])
+        value, size = clique.binary._read_varint(data, 0)
+        return value, offset + size
+
+    def _decode_record(self, record):
+        '''Return collection decoded from *record* of (offset, length).'''
+        return self._decode(*record)
+
+    def _decode(self, offset, length):
+        '''Return collection decoded from record at *offset* in map.'''
+        data = bytearray(self._map[offset:offset + length])
+        try:
+            collection, _ = clique.binary.decode(data, storage=self.storage)
+        except ValueError:
+            raise ValueError('Catalogue is truncated.')
+
+        return collection
+
+
+class _Hashes(object):
+    '''Sequence view of the sorted hashes in a catalogue table.
+
+    Allows the table to be searched with :py:mod:`bisect` without reading it
+    into memory.
+
+    '''
+
+    def __init__(self, data, count):
+        '''Initialise view of *count* entries in *data*.'''
+        super(_Hashes, self).__init__()
+        self._data = data
+        self._count = count
+
+    def __len__(self):
+        '''Return number of hashes.'''
+        return self._count
+
+    def __getitem__(self, position):
+        '''Return hash at *position*.'''
+        return _ENTRY.unpack_from(
+            self._data, _HEADER.size + position * _ENTRY.size
+        )[0]
+
+
+def _key(head, tail, padding):
+    '''Return key for *head*, *tail* and *padding*.'''
+    encode = clique.binary._encode_text
+    return encode(head), encode(tail), padding
+
+
+def _hash(key):
+    '''Return stable 64 bit hash of *key*.'''
+    head, tail, padding = key
+    digest = hashlib.md5(
+        b'\0'.join([head, tail, str(padding).encode('ascii')])
+    ).digest()
+    return struct.unpack('<Q', digest[:8])[0]
+
+
+def _ends_with_digit(value):
+    '''Return whether *value* ends with a digit.'''
+    return bool(value) and clique._DIGITS_EXPRESSION.match(value[-1])
+
+
+def _starts_with_digit(value):
+    '''Return whether *value* starts with a digit.'''
+    return bool(value) and clique._DIGITS_EXPRESSION.match(value[0])
@@ -4,17 +4,49 @@
 
 import re
 
+import clique.array_set
+import clique.cache
 import clique.descriptor
 import clique.error
 import clique.sorted_set
 
 
+#: Cache of compiled expressions used to match items against collections,
+#: keyed by (head, tail). Inspect usage with :py:meth:`LruCache.info
+#: <clique.cache.LruCache.info>`.
+expression_cache = clique.cache.LruCache(maxsize=1024)
+
+try:
+    _is_digits = str.isdecimal
+except AttributeError:
+    def _is_digits(value):
+        '''Return whether *value* consists only of ASCII digits.
+
+        Expressions in Python 2 only match ASCII digits unless flagged
+        otherwise.
+
+        '''
+        return not value.strip('0123456789')
+
+
 class Collection(object):
-    '''Represent group of items that differ only by numerical component.'''
+    '''Represent group of items that differ only by numerical component.
+
+    Collections define ``__slots__`` rather than carrying an instance
+    dictionary in order to keep their memory footprint small when many are
+    held at once. Subclasses that do not define ``__slots__`` themselves
+    regain an instance dictionary as usual.
+
+    '''
+
+    __slots__ = (
+        '_head', '_tail', 'padding', '_indexes', '_ranges_cache',
+        '__weakref__'
+    )
 
-    indexes = clique.descriptor.Unsettable('indexes')
+    indexes = clique.descriptor.Unsettable('indexes', attribute='_indexes')
 
-    def __init__(self, head, tail, padding, indexes=None):
+    def __init__(self, head, tail, padding, indexes=None, storage=None):
         '''Initialise collection.
 
         *head* is the leading common part whilst *tail* is the trailing
@@ -28,6 +60,11 @@ class Collection(object):
         *indexes* can specify a set of numerical indexes to initially populate
         the collection with.
 
+        *storage* can specify the class used to store indexes. It defaults to
+        :py:class:`~clique.sorted_set.SortedSet`. For very large collections
+        that are mainly manipulated in bulk, consider
+        :py:func:`clique.array_set.preferred_storage`.
+
         .. note::
 
             After instantiation, the ``indexes`` attribute cannot be set to a
@@ -43,11 +80,14 @@ class Collection(object):
 
         '''
         super(Collection, self).__init__()
-        self.__dict__['indexes'] = clique.sorted_set.SortedSet()
+        if storage is None:
+            storage = clique.sorted_set.SortedSet
+
+        self._indexes = storage()
+        self._ranges_cache = None
         self._head = head
         self._tail = tail
         self.padding = padding
-        self._update_expression()
 
         if indexes is not None:
             self.indexes.update(indexes)
@@ -61,7 +101,6 @@ class Collection(object):
     def head(self, value):
         '''Set common leading part to *value*.'''
         self._head = value
-        self._update_expression()
 
     @property
     def tail(self):
@@ -72,13 +111,34 @@ class Collection(object):
     def tail(self, value):
         '''Set common trailing part to *value*.'''
         self._tail = value
-        self._update_expression()
 
-    def _update_expression(self):
-        '''Update internal expression.'''
-        self._expression = re.compile(
-            '^{0}(?P<index>(?P<padding>0*)\d+?){1}$'
-            .format(re.escape(self.head), re.escape(self.tail))
+    def __getstate__(self):
+        '''Return state for pickling.'''
+        return {
+            'head': self._head,
+            'tail': self._tail,
+            'padding': self.padding,
+            'indexes': self._indexes
+        }
+
+    def __setstate__(self, state):
+        '''Restore from pickled *state*.'''
+        self._head = state['head']
+        self._tail = state['tail']
+        self.padding = state['padding']
+        self._indexes = state['indexes']
+        self._ranges_cache = None
+
+    @property
+    def _expression(self):
+        '''Return compiled expression for matching items.
+
+        The expression is only compiled when first required and is then
+        shared between collections with the same head and tail.
+
+        '''
+        return expression_cache.get(
+            (self._head, self._tail), _compile_expression
         )
 
     def __str__(self):
@@ -98,14 +158,29 @@ class Collection(object):
 
     def __contains__(self, item):
         '''Return whether *item* is present in collection.'''
-        match = self.match(item)
-        if not match:
+        index = self._match_index(item)
+        if index is None:
             return False
 
-        if not int(match.group('index')) in self.indexes:
-            return False
+        return int(index) in self._indexes
 
-        return True
+    def contains_many(self, items):
+        '''Return list of whether each of *items* is present in collection.
+
+        Equivalent to ``[item in collection for item in items]`` but avoids
+        repeated attribute lookups, so prefer it when checking many items.
+
+        '''
+        match_index = self._match_index
+        indexes = self._indexes
+
+        result = []
+        append = result.append
+        for item in items:
+            index = match_index(item)
+            append(index is not None and int(index) in indexes)
+
+        return result
 
     def __eq__(self, other):
         '''Return whether *other* collection is equal.'''
@@ -192,6 +267,42 @@ class Collection(object):
 
         return match
 
+    def _match_index(self, item):
+        '''Return index part of *item* if it matches this collection.
+
+        Equivalent to :py:meth:`match` but checks the head, tail and index
+        directly rather than running the expression. Return None if *item*
+        does not match.
+
+        '''
+        if item.endswith('\n'):
+            # The expression also matches before a trailing newline so defer
+            # to it in this rare case.
+            match = self.match(item)
+            if match is None:
+                return None
+
+            return match.group('index')
+
+        head = self._head
+        tail = self._tail
+        if not item.startswith(head) or not item.endswith(tail):
+            return None
+
+        index = item[len(head):len(item) - len(tail)]
+        if not index or not _is_digits(index):
+            return None
+
+        padding = self.padding
+        if padding == 0:
+            if len(index) > 1 and index[0] == '0':
+                return None
+
+        elif len(index) != padding:
+            return None
+
+        return index
+
     def add(self, item):
         '''Add *item* to collection.
 
@@ -199,13 +310,13 @@ class Collection(object):
         added to the collection.
 
         '''
-        match = self.match(item)
-        if match is None:
+        index = self._match_index(item)
+        if index is None:
             raise clique.error.CollectionError(
                 'Item does not match collection expression.'
             )
 
-        self.indexes.add(int(match.group('index')))
+        self.indexes.add(int(index))
 
     def remove(self, item):
         '''Remove *item* from collection.
@@ -214,13 +325,13 @@ class Collection(object):
         removed from the collection.
 
         '''
-        match = self.match(item)
-        if match is None:
+        index = self._match_index(item)
+        if index is None:
             raise clique.error.CollectionError(
                 'Item not present in collection.'
             )
 
-        index = int(match.group('index'))
+        index = int(index)
         try:
             self.indexes.remove(index)
         except KeyError:
@@ -251,71 +362,101 @@ class Collection(object):
         else:
             data['padding'] = '%d'
 
-        if '{holes}' in pattern:
-            data['holes'] = self.holes().format('{ranges}')
+        if (
+            '{range}' in pattern or '{ranges}' in pattern or
+            '{holes}' in pattern
+        ):
+            data.update(self._format_ranges(pattern))
 
-        if '{range}' in pattern or '{ranges}' in pattern:
-            indexes = list(self.indexes)
-            indexes_count = len(indexes)
+        return pattern.format(**data)
 
-            if indexes_count == 0:
-                data['range'] = ''
+    def _format_ranges(self, pattern):
+        '''Return formatted range values required by *pattern*.
 
-            elif indexes_count == 1:
-                data['range'] = '{0}'.format(indexes[0])
+        Values are computed directly from the runs of indexes and cached until
+        the indexes change.
 
-            else:
-                data['range'] = '{0}-{1}'.format(
-                    indexes[0], indexes[-1]
-                )
+        '''
+        revision = self.indexes._revision
+        if self._ranges_cache is None or self._ranges_cache[0] != revision:
+            self._ranges_cache = (revision, {})
 
-        if '{ranges}' in pattern:
-            separated = self.separate()
-            if len(separated) > 1:
-                ranges = [collection.format('{range}')
-                          for collection in separated]
+        cache = self._ranges_cache[1]
 
-            else:
-                ranges = [data['range']]
+        if '{range}' in pattern and 'range' not in cache:
+            runs = list(self.indexes.runs())
+            if runs:
+                runs = [(runs[0][0], runs[-1][1])]
 
-            data['ranges'] = ', '.join(ranges)
+            cache['range'] = _format_runs(runs)
 
-        return pattern.format(**data)
+        if '{ranges}' in pattern and 'ranges' not in cache:
+            cache['ranges'] = _format_runs(self.iter_runs())
+
+        if '{holes}' in pattern and 'holes' not in cache:
+            cache['holes'] = _format_runs(self.iter_holes())
+
+        return cache
+
+    def indexes_array(self):
+        '''Return indexes as a sorted NumPy array.
+
+        When indexes are stored in an
+        :py:class:`~clique.array_set.ArraySortedSet` a read only view of the
+        underlying array is returned without copying. Otherwise a new array is
+        built from the runs of indexes.
+
+        raise :py:exc:`ImportError` if NumPy is not available.
+
+        '''
+        return clique.array_set.to_array(self.indexes)
 
     def is_contiguous(self):
         '''Return whether entire collection is contiguous.'''
-        previous = None
-        for index in self.indexes:
-            if previous is None:
-                previous = index
-                continue
+        runs = self.iter_runs()
+        next(runs, None)
+        return next(runs, None) is None
 
-            if index != (previous + 1):
-                return False
+    def iter_runs(self):
+        '''Return iterator over contiguous runs of indexes.
 
-            previous = index
+        Each run is an inclusive (start, end) tuple. Runs are produced lazily
+        in ascending order.
 
-        return True
+        '''
+        return self.indexes.runs()
 
-    def holes(self):
-        '''Return holes in collection.
+    def iter_holes(self):
+        '''Return iterator over holes in collection.
 
-        Return :py:class:`~clique.collection.Collection` of missing indexes.
+        Each hole is an inclusive (start, end) tuple of missing indexes between
+        the first and last index. Holes are produced lazily in ascending order
+        without expanding the missing indexes.
 
         '''
-        missing = set([])
         previous = None
-        for index in self.indexes:
-            if previous is None:
-                previous = index
-                continue
+        for start, end in self.iter_runs():
+            if previous is not None:
+                yield previous + 1, start - 1
 
-            if index != (previous + 1):
-                missing.update(range(previous + 1, index))
+            previous = end
 
-            previous = index
+    def holes(self):
+        '''Return holes in collection.
 
-        return Collection(self.head, self.tail, self.padding, indexes=missing)
+        Return :py:class:`~clique.collection.Collection` of missing indexes.
+
+        '''
+        holes = Collection(
+            self.head, self.tail, self.padding, storage=type(self.indexes)
+        )
+
+        # Add all holes in one bulk update, as adding each range in turn is
+        # slow for array storage.
+        holes.indexes.update(
+            clique.sorted_set.SortedSet._from_runs(self.iter_holes())
+        )
+        return holes
 
     def is_compatible(self, collection):
         '''Return whether *collection* is compatible with this collection.
@@ -347,6 +488,118 @@ class Collection(object):
 
         self.indexes.update(collection.indexes)
 
+    def union(self, collection):
+        '''Return new collection with indexes from this and *collection*.
+
+        raise :py:class:`~clique.error.CollectionError` if *collection* is not
+        compatible with this collection.
+
+        '''
+        return self._combine(collection, self.indexes.__or__)
+
+    def intersection(self, collection):
+        '''Return new collection with indexes common to this and *collection*.
+
+        raise :py:class:`~clique.error.CollectionError` if *collection* is not
+        compatible with this collection.
+
+        '''
+        return self._combine(collection, self.indexes.__and__)
+
+    def difference(self, collection):
+        '''Return new collection with indexes not present in *collection*.
+
+        raise :py:class:`~clique.error.CollectionError` if *collection* is not
+        compatible with this collection.
+
+        '''
+        return self._combine(collection, self.indexes.__sub__)
+
+    def symmetric_difference(self, collection):
+        '''Return new collection with indexes in only one of the collections.
+
+        raise :py:class:`~clique.error.CollectionError` if *collection* is not
+        compatible with this collection.
+
+        '''
+        return self._combine(collection, self.indexes.__xor__)
+
+    def _combine(self, collection, operation):
+        '''Return new collection from *operation* on *collection* indexes.'''
+        if not self.is_compatible(collection):
+            raise clique.error.CollectionError('Collection is not compatible '
+                                               'with this collection.')
+
+        result = Collection(
+            self.head, self.tail, self.padding, storage=type(self.indexes)
+        )
+        result.indexes.update(operation(collection.indexes))
+        return result
+
+    def __or__(self, other):
+        '''Return union with *other* collection.'''
+        if not isinstance(other, Collection):
+            return NotImplemented
+
+        return self.union(other)
+
+    def __and__(self, other):
+        '''Return intersection with *other* collection.'''
+        if not isinstance(other, Collection):
+            return NotImplemented
+
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        '''Return difference with *other* collection.'''
+        if not isinstance(other, Collection):
+            return NotImplemented
+
+        return self.difference(other)
+
+    def __xor__(self, other):
+        '''Return symmetric difference with *other* collection.'''
+        if not isinstance(other, Collection):
+            return NotImplemented
+
+        return self.symmetric_difference(other)
+
+    def __ior__(self, other):
+        '''Update with union of *other* collection.'''
+        if not isinstance(other, Collection):
+            return NotImplemented
+
+        self.merge(other)
+        return self
+
+    def __iand__(self, other):
+        '''Update with intersection of *other* collection.'''
+        return self._combine_in_place(
+            other, self.indexes.intersection_update
+        )
+
+    def __isub__(self, other):
+        '''Update with difference of *other* collection.'''
+        return self._combine_in_place(other, self.indexes.difference_update)
+
+    def __ixor__(self, other):
+        '''Update with symmetric difference of *other* collection.'''
+        return self._combine_in_place(
+            other, self.indexes.symmetric_difference_update
+        )
+
+    def _combine_in_place(self, other, operation):
+        '''Update indexes with *operation* on *other* collection indexes.'''
+        if not isinstance(other, Collection):
+            return NotImplemented
+
+        if not self.is_compatible(other):
+            raise clique.error.CollectionError('Collection is not compatible '
+                                               'with this collection.')
+
+        operation(other.indexes)
+        return self
+
     def separate(self):
         '''Return contiguous parts of collection as separate collections.
 
@@ -354,32 +607,41 @@ class Collection(object):
 
         '''
         collections = []
-        start = None
-        end = None
+        for start, end in self.iter_runs():
+            collection = Collection(
+                self.head, self.tail, self.padding,
+                storage=type(self.indexes)
+            )
+            collection.indexes.add_range(start, end)
+            collections.append(collection)
 
-        for index in self.indexes:
-            if start is None:
-                start = index
-                end = start
-                continue
-
-            if index != (end + 1):
-                collections.append(
-                    Collection(self.head, self.tail, self.padding,
-                               indexes=set(range(start, end + 1)))
+        if not collections:
+            collections.append(
+                Collection(
+                    self.head, self.tail, self.padding,
+                    storage=type(self.indexes)
                 )
-                start = index
+            )
 
-            end = index
+        return collections
 
-        if start is None:
-            collections.append(
-                Collection(self.head, self.tail, self.padding)
-            )
+
+def _compile_expression(key):
+    '''Return compiled expression for *key* of (head, tail).'''
+    head, tail = key
+    return re.compile(
+        r'^{0}(?P<index>(?P<padding>0*)\d+?){1}$'
+        .format(re.escape(head), re.escape(tail))
+    )
+
+
+def _format_runs(runs):
+    '''Return comma separated string of inclusive *runs*.'''
+    parts = []
+    for start, end in runs:
+        if start == end:
+            parts.append('{0}'.format(start))
         else:
-            collections.append(
-                Collection(self.head, self.tail, self.padding,
-                           indexes=range(start, end + 1))
-            )
+            parts.append('{0}-{1}'.format(start, end))
 
-        return collections
+    return ', '.join(parts)
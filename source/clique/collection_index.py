@@ -0,0 +1,150 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Find the collection an item belongs to amongst many collections.'''
+
+import clique
+
+
+class CollectionIndex(object):
+    '''Index collections by head, tail and padding for fast membership lookup.
+
+    Checking which of many collections an item belongs to by testing each
+    collection in turn gets slower as more collections are added. Instead, an
+    index splits the item around each run of digits, as
+    :py:func:`~clique.assemble` does, and looks up only the collections with
+    a matching head, tail and padding::
+
+        >>> index = CollectionIndex(collections)
+        >>> index.lookup('/path/to/file.0001.exr')
+        <Collection "/path/to/file.%04d.exr [1-10]">
+
+    The indexes of a collection may be changed freely whilst it is in the
+    index, but its head, tail and padding must not be changed without first
+    removing it.
+
+    '''
+
+    def __init__(self, collections=None, case_sensitive=True):
+        '''Initialise index, adding any *collections* given.
+
+        If *case_sensitive* is False, items match collections whose head and
+        tail only differ from them in casing.
+
+        '''
+        super(CollectionIndex, self).__init__()
+        self.case_sensitive = case_sensitive
+        self._collections = {}
+        self._count = 0
+
+        # Number of collections with a head ending, or tail starting, with a
+        # digit. Whilst there are none, only whole runs of digits need to be
+        # considered as the index of an item.
+        self._partial_digits = 0
+
+        if collections is not None:
+            for collection in collections:
+                self.add(collection)
+
+    def __len__(self):
+        '''Return number of collections in index.'''
+        return self._count
+
+    def __iter__(self):
+        '''Return iterator over collections in index.'''
+        for collections in self._collections.values():
+            for collection in collections:
+                yield collection
+
+    def add(self, collection):
+        '''Add *collection* to index.'''
+        key = self._key(collection)
+        self._collections.setdefault(key, []).append(collection)
+        self._count += 1
+
+        if clique._has_partial_digits(collection):
+            self._partial_digits += 1
+
+    def remove(self, collection):
+        '''Remove *collection* from index.
+
+        raise :py:exc:`KeyError` if *collection* is not in the index.
+
+        '''
+        key = self._key(collection)
+        collections = self._collections.get(key, [])
+        for position, candidate in enumerate(collections):
+            if candidate is collection:
+                break
+        else:
+            raise KeyError(collection)
+
+        del collections[position]
+        if not collections:
+            del self._collections[key]
+
+        self._count -= 1
+
+        if clique._has_partial_digits(collection):
+            self._partial_digits -= 1
+
+    def lookup(self, item):
+        '''Return collection *item* is a member of or None.
+
+        If *item* is a member of several collections, only one of them is
+        returned.
+
+        '''
+        collections = self._collections
+        if not collections:
+            return None
+
+        if not self.case_sensitive:
+            item = item.lower()
+
+        splits = clique._split_digits(item, partial=bool(self._partial_digits))
+        for head, index, tail in splits:
+            width = len(index)
+
+            # An index without leading zeros could belong to either an
+            # unpadded collection or one padded to exactly its width.
+            if width > 1 and index[0] == '0':
+                candidates = collections.get((head, tail, width))
+            else:
+                candidates = collections.get((head, tail, 0))
+                padded = collections.get((head, tail, width))
+                if candidates is None:
+                    candidates = padded
+                elif padded is not None:
+                    candidates = candidates + padded
+
+            if candidates is None:
+                continue
+
+            index = int(index)
+            for collection in candidates:
+                if index in collection.indexes:
+                    return collection
+
+        return None
+
+    def lookup_many(self, items):
+        '''Return list of the collection each of *items* is a member of.
+
+        Equivalent to ``[index.lookup(item) for item in items]``.
+
+        '''
+        lookup = self.lookup
+        return [lookup(item) for item in items]
+
+    def _key(self, collection):
+        '''Return key for *collection*.'''
+        head = collection.head
+        tail = collection.tail
+        if not self.case_sensitive:
+            head = head.lower()
+            tail = tail.lower()
+
+        return head, tail, collection.padding
+
@@ -21,24 +21,49 @@ class Unsettable(object):
         >>> foo.x = False
         AttributeError: Cannot set attribute defined as unsettable.
 
+    Classes that define ``__slots__``, and so have no instance dictionary, can
+    instead name the slot holding the value::
+
+        >>> class Bar(object):
+        ...
+        ...     __slots__ = ('_x',)
+        ...     x = Unsettable('x', attribute='_x')
+        ...
+        ...     def __init__(self):
+        ...         self._x = True
+        ...
+
     '''
 
-    def __init__(self, label):
+    def __init__(self, label, attribute=None):
         '''Initialise descriptor with property *label*.
 
         *label* should match the name of the property being described::
 
             x = Unsettable('x')
 
+        *attribute* can name an alternative attribute, such as a slot, to read
+        the value from instead of the instance dictionary.
+
         '''
         self.label = label
+        self.attribute = attribute
         super(Unsettable, self).__init__()
 
     def __get__(self, instance, owner):
-        '''Return value of property for *instance*.'''
+        '''Return value of property for *instance*.
+
+        Return the descriptor itself when accessed on the *owner* class.
+
+        '''
+        if instance is None:
+            return self
+
+        if self.attribute is not None:
+            return getattr(instance, self.attribute, None)
+
         return instance.__dict__.get(self.label)
 
     def __set__(self, instance, value):
         '''Set *value* for *instance* property.'''
         raise AttributeError('Cannot set attribute defined as unsettable.')
-
@@ -0,0 +1,358 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Assemble collections directly from directories on disk.'''
+
+import multiprocessing
+import os
+import stat as _stat
+import sys
+import threading
+from collections import namedtuple
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from os import scandir as _scandir
+except ImportError:
+    try:
+        from scandir import scandir as _scandir
+    except ImportError:
+        _scandir = None
+
+import clique
+
+
+#: Result of scanning a single directory.
+#:
+#: *path* is the scanned directory, *collections* and *remainder* are as
+#: returned by :py:func:`clique.assemble` and *stats* maps each entry name to
+#: a :py:class:`FileStat`, or is None if stat information was not requested.
+ScanResult = namedtuple(
+    'ScanResult', ['path', 'collections', 'remainder', 'stats']
+)
+
+#: Size in bytes and modification time of a directory entry.
+FileStat = namedtuple('FileStat', ['size', 'mtime'])
+
+
+def scan(
+    path, recursive=False, filter=None, follow_symlinks=False,
+    include_hidden=True, stat=False, onerror=None, **kw
+):
+    '''Yield :py:class:`ScanResult` for each directory scanned from *path*.
+
+    Entries are streamed from :py:func:`os.scandir` straight into an
+    :py:class:`~clique.Assembler`, so the directory listing is never held in
+    memory as a whole. Each directory is assembled independently and the
+    names of its entries, including subdirectories, are used as items, as for
+    ``clique.assemble(os.listdir(path))``.
+
+    If *recursive* is True, subdirectories are scanned as well, each yielding
+    its own result after that of its parent.
+
+    *filter* can be a callable that receives each directory entry and returns
+    whether to include it as an item. Excluded subdirectories are still
+    scanned when *recursive* is True.
+
+    If *follow_symlinks* is True, symbolic links to directories are scanned
+    when *recursive* is True and stat information describes the target of a
+    link rather than the link itself. As for :py:func:`os.walk`, a link to a
+    parent directory will then be scanned repeatedly without end.
+
+    If *include_hidden* is False, entries whose name begins with a dot are
+    ignored entirely and not scanned.
+
+    If *stat* is True, the size and modification time of each included entry
+    is kept in the *stats* of the result. The information is taken from the
+    directory entry, so it is only fetched once per entry and is free on
+    platforms where the directory listing already provides it.
+
+    *onerror* can be a callable that receives the :py:exc:`OSError` raised
+    when a directory cannot be listed. By default such errors are ignored, as
+    for :py:func:`os.walk`.
+
+    Any additional keyword arguments are passed to
+    :py:class:`~clique.Assembler`.
+
+    '''
+    options = dict(
+        filter=filter, follow_symlinks=follow_symlinks,
+        include_hidden=include_hidden, stat=stat
+    )
+
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        try:
+            result, subdirectories = _scan_directory(
+                directory, options, kw, recursive
+            )
+        except OSError as error:
+            if onerror is not None:
+                onerror(error)
+            continue
+
+        yield result
+
+        if recursive:
+            # Reverse so that subdirectories are scanned in listing order.
+            pending.extend(reversed(subdirectories))
+
+
+def scan_tree(
+    root, workers=None, max_depth=None, cancel=None, filter=None,
+    follow_symlinks=False, include_hidden=True, stat=False, onerror=None,
+    **kw
+):
+    '''Yield :py:class:`ScanResult` for each directory in tree at *root*.
+
+    Directories are scanned concurrently by *workers* threads, defaulting to
+    a few more than the number of CPUs, and results are yielded as they
+    complete. Listing directories is dominated by waiting on the filesystem,
+    particularly for network filesystems, so scanning several at once can
+    greatly reduce the total time. The order of results is therefore not
+    fixed, though a directory is always yielded before its subdirectories.
+
+    *max_depth* can limit how deep to scan, with zero scanning only *root*,
+    one also scanning its immediate subdirectories and so on. By default the
+    whole tree is scanned.
+
+    *cancel* can be a :py:class:`threading.Event` that stops the scan when
+    set. No new directories are started once it is set, though directories
+    already being scanned are allowed to finish. Closing the returned
+    generator also stops the scan.
+
+    *filter*, *follow_symlinks*, *include_hidden*, *stat*, *onerror* and any
+    additional keyword arguments have the same meaning as for
+    :py:func:`scan`.
+
+    '''
+    if workers is None:
+        workers = min(32, multiprocessing.cpu_count() + 4)
+
+    options = dict(
+        filter=filter, follow_symlinks=follow_symlinks,
+        include_hidden=include_hidden, stat=stat
+    )
+
+    assembly_stats = kw.get('stats')
+
+    tasks = queue.Queue()
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def work():
+        '''Scan directories from tasks until told to stop.'''
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+
+            if stop.is_set():
+                continue
+
+            path, depth = task
+
+            # Record statistics for each directory separately so that
+            # workers never update the same instance at once.
+            directory_stats = None
+            assembler_options = kw
+            if assembly_stats is not None:
+                directory_stats = clique.AssemblyStats()
+                assembler_options = dict(kw, stats=directory_stats)
+
+            try:
+                result, subdirectories = _scan_directory(
+                    path, options, assembler_options,
+                    max_depth is None or depth < max_depth
+                )
+            except Exception:
+                results.put((None, sys.exc_info()[1], depth, None))
+            else:
+                results.put((result, subdirectories, depth, directory_stats))
+
+    threads = []
+    for _ in range(max(1, workers)):
+        thread = threading.Thread(target=work)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+
+    try:
+        tasks.put((root, 0))
+        pending = 1
+
+        while pending:
+            if cancel is not None and cancel.is_set():
+                return
+
+            try:
+                result, subdirectories, depth, directory_stats = (
+                    results.get(timeout=0.1)
+                )
+            except queue.Empty:
+                continue
+
+            pending -= 1
+
+            if directory_stats is not None:
+                assembly_stats.add(directory_stats)
+
+            if result is None:
+                error = subdirectories
+                if not isinstance(error, OSError):
+                    raise error
+
+                if onerror is not None:
+                    onerror(error)
+                continue
+
+            if max_depth is None or depth < max_depth:
+                for subdirectory in subdirectories:
+                    tasks.put((subdirectory, depth + 1))
+                    pending += 1
+
+            yield result
+
+    finally:
+        stop.set()
+        for _ in threads:
+            tasks.put(None)
+
+        for thread in threads:
+            thread.join()
+
+
+def _scan_directory(path, options, assembler_options, recursive):
+    '''Return :py:class:`ScanResult` and subdirectory paths for *path*.
+
+    *options* should contain the filter, follow_symlinks, include_hidden and
+    stat options accepted by :py:func:`scan`, whilst *assembler_options* are
+    passed to :py:class:`~clique.Assembler`.
+
+    Subdirectories are only found if *recursive* is True, as checking whether
+    an entry is a directory can require a system call per entry.
+
+    '''
+    entry_filter = options['filter']
+    follow_symlinks = options['follow_symlinks']
+    include_hidden = options['include_hidden']
+
+    stats = None
+    if options['stat']:
+        stats = {}
+
+    subdirectories = []
+
+    def names(entries):
+        '''Yield names of included *entries*, recording side information.'''
+        for entry in entries:
+            name = entry.name
+            if not include_hidden and name.startswith('.'):
+                continue
+
+            if recursive:
+                try:
+                    is_directory = entry.is_dir(
+                        follow_symlinks=follow_symlinks
+                    )
+                except OSError:
+                    is_directory = False
+
+                if is_directory:
+                    subdirectories.append(entry.path)
+
+            if entry_filter is not None and not entry_filter(entry):
+                continue
+
+            if stats is not None:
+                try:
+                    info = entry.stat(follow_symlinks=follow_symlinks)
+                except OSError:
+                    stats[name] = None
+                else:
+                    stats[name] = FileStat(info.st_size, info.st_mtime)
+
+            yield name
+
+    assembler = clique.Assembler(**assembler_options)
+
+    entries = _iter_entries(path)
+    try:
+        assembler.feed(names(entries))
+    finally:
+        close = getattr(entries, 'close', None)
+        if close is not None:
+            close()
+
+    result = ScanResult(
+        path, assembler.collections(), assembler.remainder(), stats
+    )
+    return result, subdirectories
+
+
+def _iter_entries(path):
+    '''Return iterator over directory entries of *path*.
+
+    Use :py:func:`os.scandir` or the scandir backport where available, falling
+    back to :py:func:`os.listdir` otherwise.
+
+    '''
+    if _scandir is not None:
+        return _scandir(path)
+
+    return (_Entry(path, name) for name in os.listdir(path))
+
+
+class _Entry(object):
+    '''Minimal directory entry for when :py:func:`os.scandir` is missing.'''
+
+    __slots__ = ('name', 'path', '_stat', '_lstat')
+
+    def __init__(self, directory, name):
+        '''Initialise entry for *name* in *directory*.'''
+        super(_Entry, self).__init__()
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self._stat = None
+        self._lstat = None
+
+    def stat(self, follow_symlinks=True):
+        '''Return stat result for entry, following symbolic links if set.'''
+        if not follow_symlinks:
+            if self._lstat is None:
+                self._lstat = os.lstat(self.path)
+
+            return self._lstat
+
+        if self._stat is None:
+            lstat = self.stat(follow_symlinks=False)
+            if _stat.S_ISLNK(lstat.st_mode):
+                self._stat = os.stat(self.path)
+            else:
+                self._stat = lstat
+
+        return self._stat
+
+    def is_dir(self, follow_symlinks=True):
+        '''Return whether entry is a directory.'''
+        try:
+            mode = self.stat(follow_symlinks=follow_symlinks).st_mode
+        except OSError:
+            return False
+
+        return _stat.S_ISDIR(mode)
+
+    def is_symlink(self):
+        '''Return whether entry is a symbolic link.'''
+        try:
+            mode = self.stat(follow_symlinks=False).st_mode
+        except OSError:
+            return False
+
+        return _stat.S_ISLNK(mode)
@@ -0,0 +1,80 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Assemble large numbers of items across multiple processes.'''
+
+import itertools
+import multiprocessing
+
+import clique
+
+
+def assemble(iterable, workers=None, chunk_size=100000, **kw):
+    '''Assemble items in *iterable* using a pool of worker processes.
+
+    *iterable* is consumed in chunks of *chunk_size* items. Each chunk is
+    scanned by one of *workers* processes (defaulting to the number of CPUs)
+    and the partial results are then merged in order, so the result is
+    identical to calling :py:func:`clique.assemble` with the same *iterable*.
+
+    Any additional keyword arguments are passed to
+    :py:class:`~clique.Assembler`.
+
+    .. note::
+
+        Items are transferred to and from the worker processes, which has a
+        cost. For small numbers of items :py:func:`clique.assemble` will
+        usually be faster.
+
+    Return tuple of two lists (collections, remainder) as for
+    :py:func:`clique.assemble`.
+
+    '''
+    assembler = clique.Assembler(**kw)
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    if workers <= 1:
+        assembler.feed(iterable)
+        return assembler.collections(), assembler.remainder()
+
+    # Each worker records statistics separately, which are then added to
+    # those of the final assembler as partial results are merged.
+    options = kw
+    if kw.get('stats') is not None:
+        options = dict(kw, stats=clique.AssemblyStats())
+
+    tasks = ((options, chunk) for chunk in _chunks(iterable, chunk_size))
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        for partial in pool.imap(_scan, tasks):
+            assembler.merge(partial)
+
+    finally:
+        pool.terminate()
+        pool.join()
+
+    return assembler.collections(), assembler.remainder()
+
+
+def _chunks(iterable, size):
+    '''Yield lists of up to *size* items from *iterable*.'''
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def _scan(task):
+    '''Return assembler for task of (options, items).'''
+    options, items = task
+    assembler = clique.Assembler(**options)
+    assembler.feed(items)
+    assembler._flush()
+    return assembler
@@ -2,23 +2,78 @@
 # :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
 # :license: See LICENSE.txt.
 
-import collections
 import bisect
+import heapq
 
+try:
+    from collections.abc import MutableSet, Set
+except ImportError:
+    from collections import MutableSet, Set
 
-class SortedSet(collections.MutableSet):
-    '''Maintain sorted collection of unique items.'''
+
+def _slotted(abstract):
+    '''Return slotted class providing the mixin methods of *abstract*.'''
+    namespace = {}
+    for base in reversed(abstract.__mro__[:-1]):
+        for name, value in vars(base).items():
+            if name.startswith('_abc_') or name in (
+                '__dict__', '__weakref__', '__module__', '__doc__',
+                '__metaclass__', '__abstractmethods__'
+            ):
+                continue
+
+            namespace[name] = value
+
+    namespace['__slots__'] = ()
+    return type(abstract.__name__, (object,), namespace)
+
+
+# Under Python 2 the abstract base classes do not define __slots__, so
+# subclasses would still carry an instance dictionary. Inherit the mixin
+# methods from a slotted copy instead and register as a virtual subclass.
+if '__slots__' in vars(MutableSet):
+    _MutableSet = MutableSet
+else:
+    _MutableSet = _slotted(MutableSet)
+
+
+class SortedSet(_MutableSet):
+    '''Maintain sorted collection of unique integers.
+
+    Members are stored as runs of consecutive integers rather than
+    individually. Each run is held as an inclusive (start, end) pair so a
+    contiguous sequence costs the same regardless of its length.
+
+    '''
+
+    __slots__ = ('_starts', '_ends', '_length', '_revision')
 
     def __init__(self, iterable=None):
         '''Initialise with items from *iterable*.'''
         super(SortedSet, self).__init__()
-        self._members = []
+        self._starts = []
+        self._ends = []
+        self._length = 0
+
+        # Incremented on every modification so that dependent values, such as
+        # formatted ranges, can be cached until the members change.
+        self._revision = 0
+
         if iterable:
             self.update(iterable)
 
+    def __getstate__(self):
+        '''Return state for pickling.'''
+        return self._starts, self._ends, self._length
+
+    def __setstate__(self, state):
+        '''Restore from pickled *state*.'''
+        self._starts, self._ends, self._length = state
+        self._revision = 0
+
     def __str__(self):
         '''Return string representation.'''
-        return str(self._members)
+        return str(list(self))
 
     def __repr__(self):
         '''Return representation.'''
@@ -26,37 +81,429 @@ class SortedSet(collections.MutableSet):
 
     def __contains__(self, item):
         '''Return whether *item* is present.'''
-        return self._index(item) >= 0
+        index = bisect.bisect_right(self._starts, item)
+        return index > 0 and self._ends[index - 1] >= item
 
     def __len__(self):
         '''Return number of items.'''
-        return len(self._members)
+        return self._length
 
     def __iter__(self):
         '''Return iterator over items.'''
-        return iter(self._members)
+        for start, end in self.runs():
+            for item in range(start, end + 1):
+                yield item
+
+    def __eq__(self, other):
+        '''Return whether *other* set is equal.'''
+        if isinstance(other, SortedSet):
+            return self._starts == other._starts and self._ends == other._ends
+
+        return super(SortedSet, self).__eq__(other)
+
+    def __ne__(self, other):
+        '''Return whether *other* set is not equal.'''
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+
+        return not result
+
+    def __or__(self, other):
+        '''Return union with *other* set.'''
+        if not isinstance(other, Set):
+            return NotImplemented
+
+        result = self._from_runs(self.runs())
+        result.update(other)
+        return result
+
+    def __and__(self, other):
+        '''Return intersection with *other* set.'''
+        if not isinstance(other, Set):
+            return NotImplemented
+
+        return self._from_runs(
+            _intersect_runs(self.runs(), _runs(other))
+        )
+
+    def __sub__(self, other):
+        '''Return difference with *other* set.'''
+        if not isinstance(other, Set):
+            return NotImplemented
+
+        return self._from_runs(
+            _subtract_runs(self.runs(), _runs(other))
+        )
+
+    def __xor__(self, other):
+        '''Return symmetric difference with *other* set.'''
+        if not isinstance(other, Set):
+            return NotImplemented
+
+        other_runs = list(_runs(other))
+        result = self._from_runs(_subtract_runs(self.runs(), other_runs))
+        result.update(
+            self._from_runs(_subtract_runs(other_runs, self.runs()))
+        )
+        return result
+
+    def __ior__(self, other):
+        '''Update with union of *other* set.'''
+        self.update(other)
+        return self
+
+    def __iand__(self, other):
+        '''Update with intersection of *other* set.'''
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other):
+        '''Update with difference of *other* set.'''
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other):
+        '''Update with symmetric difference of *other* set.'''
+        self.symmetric_difference_update(other)
+        return self
+
+    @classmethod
+    def _from_runs(cls, runs):
+        '''Return new set from sorted, disjoint and non-adjacent *runs*.'''
+        instance = cls()
+        for start, end in runs:
+            instance._starts.append(start)
+            instance._ends.append(end)
+            instance._length += end - start + 1
+
+        return instance
+
+    def runs(self):
+        '''Return iterator over contiguous runs of items.
+
+        Each run is an inclusive (start, end) tuple and runs are returned in
+        ascending order.
+
+        '''
+        return iter(zip(self._starts, self._ends))
 
     def add(self, item):
         '''Add *item*.'''
-        if not item in self:
-            index = bisect.bisect_right(self._members, item)
-            self._members.insert(index, item)
+        starts = self._starts
+        ends = self._ends
+
+        index = bisect.bisect_right(starts, item)
+        if index and ends[index - 1] >= item:
+            return
+
+        join_previous = index and ends[index - 1] == item - 1
+        join_next = index < len(starts) and starts[index] == item + 1
+
+        if join_previous and join_next:
+            ends[index - 1] = ends[index]
+            del starts[index]
+            del ends[index]
+
+        elif join_previous:
+            ends[index - 1] = item
+
+        elif join_next:
+            starts[index] = item
+
+        else:
+            starts.insert(index, item)
+            ends.insert(index, item)
+
+        self._length += 1
+        self._revision += 1
+
+    def add_range(self, start, end):
+        '''Add all items from *start* to *end* inclusive.'''
+        if end < start:
+            return
+
+        starts = self._starts
+        ends = self._ends
+
+        # Locate runs that overlap or directly neighbour the new range as they
+        # will be absorbed into it.
+        low = bisect.bisect_left(ends, start - 1)
+        high = bisect.bisect_right(starts, end + 1)
+
+        if low < high:
+            removed = 0
+            for index in range(low, high):
+                removed += ends[index] - starts[index] + 1
+
+            start = min(start, starts[low])
+            end = max(end, ends[high - 1])
+            self._length -= removed
+
+        starts[low:high] = [start]
+        ends[low:high] = [end]
+        self._length += end - start + 1
+        self._revision += 1
 
     def discard(self, item):
         '''Remove *item*.'''
-        index = self._index(item)
-        if index >= 0:
-            del self._members[index]
+        index = self._run(item)
+        if index < 0:
+            return
+
+        starts = self._starts
+        ends = self._ends
+        start = starts[index]
+        end = ends[index]
+
+        if start == end:
+            del starts[index]
+            del ends[index]
+
+        elif item == start:
+            starts[index] = item + 1
+
+        elif item == end:
+            ends[index] = item - 1
+
+        else:
+            ends[index] = item - 1
+            starts.insert(index + 1, item + 1)
+            ends.insert(index + 1, end)
+
+        self._length -= 1
+        self._revision += 1
+
+    def discard_range(self, start, end):
+        '''Remove all items from *start* to *end* inclusive.'''
+        if end < start:
+            return
+
+        starts = self._starts
+        ends = self._ends
+
+        # Locate runs that overlap the range. Only the parts of the first and
+        # last runs that lie outside the range are kept.
+        low = bisect.bisect_left(ends, start)
+        high = bisect.bisect_right(starts, end)
+        if low >= high:
+            return
+
+        kept_starts = []
+        kept_ends = []
+
+        if starts[low] < start:
+            kept_starts.append(starts[low])
+            kept_ends.append(start - 1)
+
+        if ends[high - 1] > end:
+            kept_starts.append(end + 1)
+            kept_ends.append(ends[high - 1])
+
+        for index in range(low, high):
+            self._length -= ends[index] - starts[index] + 1
+
+        for kept_start, kept_end in zip(kept_starts, kept_ends):
+            self._length += kept_end - kept_start + 1
+
+        starts[low:high] = kept_starts
+        ends[low:high] = kept_ends
+        self._revision += 1
+
+    def clear(self):
+        '''Remove all items.'''
+        self._starts = []
+        self._ends = []
+        self._length = 0
+        self._revision += 1
 
     def update(self, iterable):
-        '''Update items with those from *iterable*.'''
-        for item in iterable:
-            self.add(item)
-
-    def _index(self, item):
-        '''Return index of *item* in member list or -1 if not present.'''
-        index = bisect.bisect_left(self._members, item)
-        if index != len(self) and self._members[index] == item:
+        '''Update items with those from *iterable*.
+
+        Items are sorted once and merged with existing members in a single
+        linear pass rather than being added individually. Input that is
+        already sorted is not reordered and items that all follow the existing
+        members are appended directly.
+
+        '''
+        if isinstance(iterable, SortedSet):
+            runs = list(iterable.runs())
+        else:
+            runs = _compress(sorted(iterable))
+
+        if not runs:
+            return
+
+        self._revision += 1
+        starts = self._starts
+        ends = self._ends
+
+        if not starts or runs[0][0] > ends[-1] + 1:
+            # Fast path for appending beyond the current end.
+            for start, end in runs:
+                starts.append(start)
+                ends.append(end)
+                self._length += end - start + 1
+
+            return
+
+        if runs[0][0] == ends[-1] + 1:
+            # Fast path for extending the last run.
+            self._length += runs[0][1] - ends[-1]
+            ends[-1] = runs[0][1]
+            for start, end in runs[1:]:
+                starts.append(start)
+                ends.append(end)
+                self._length += end - start + 1
+
+            return
+
+        self._merge(runs)
+
+    def difference_update(self, iterable):
+        '''Remove items present in *iterable*.'''
+        self._replace(_subtract_runs(self.runs(), _runs(iterable)))
+
+    def intersection_update(self, iterable):
+        '''Keep only items also present in *iterable*.'''
+        self._replace(_intersect_runs(self.runs(), _runs(iterable)))
+
+    def symmetric_difference_update(self, iterable):
+        '''Keep only items present in either this set or *iterable*.'''
+        self._replace((self ^ SortedSet._from_runs(_runs(iterable))).runs())
+
+    def _replace(self, runs):
+        '''Replace members with sorted, disjoint and non-adjacent *runs*.'''
+        replacement = SortedSet._from_runs(runs)
+        self._starts = replacement._starts
+        self._ends = replacement._ends
+        self._length = replacement._length
+        self._revision += 1
+
+    def _merge(self, runs):
+        '''Merge sorted, disjoint *runs* into existing runs.'''
+        merged_starts = []
+        merged_ends = []
+        length = 0
+
+        current_start = None
+        current_end = None
+
+        existing = zip(self._starts, self._ends)
+        for start, end in heapq.merge(existing, runs):
+            if current_start is None:
+                current_start = start
+                current_end = end
+
+            elif start <= current_end + 1:
+                if end > current_end:
+                    current_end = end
+
+            else:
+                merged_starts.append(current_start)
+                merged_ends.append(current_end)
+                length += current_end - current_start + 1
+                current_start = start
+                current_end = end
+
+        if current_start is not None:
+            merged_starts.append(current_start)
+            merged_ends.append(current_end)
+            length += current_end - current_start + 1
+
+        self._starts = merged_starts
+        self._ends = merged_ends
+        self._length = length
+
+    def _run(self, item):
+        '''Return index of run containing *item* or -1 if not present.'''
+        index = bisect.bisect_right(self._starts, item) - 1
+        if index >= 0 and self._ends[index] >= item:
             return index
 
         return -1
+
+
+if _MutableSet is not MutableSet:
+    MutableSet.register(SortedSet)
+
+
+def _compress(items):
+    '''Return list of inclusive runs for sorted *items*.
+
+    Duplicate items are permitted and ignored.
+
+    '''
+    runs = []
+    start = None
+    end = None
+
+    for item in items:
+        if start is None:
+            start = item
+            end = item
+            continue
+
+        if item > end + 1:
+            runs.append((start, end))
+            start = item
+
+        end = item
+
+    if start is not None:
+        runs.append((start, end))
+
+    return runs
+
+
+def _runs(iterable):
+    '''Return inclusive runs for items in *iterable*.'''
+    if isinstance(iterable, SortedSet):
+        return list(iterable.runs())
+
+    return _compress(sorted(iterable))
+
+
+def _intersect_runs(a, b):
+    '''Yield runs present in both sorted run iterables *a* and *b*.'''
+    a = iter(a)
+    b = iter(b)
+    current_a = next(a, None)
+    current_b = next(b, None)
+
+    while current_a is not None and current_b is not None:
+        start = max(current_a[0], current_b[0])
+        end = min(current_a[1], current_b[1])
+        if start <= end:
+            yield start, end
+
+        # Advance whichever run finishes first as it cannot overlap any
+        # further runs of the other.
+        if current_a[1] < current_b[1]:
+            current_a = next(a, None)
+        else:
+            current_b = next(b, None)
+
+
+def _subtract_runs(a, b):
+    '''Yield runs of sorted run iterable *a* not present in *b*.'''
+    b = iter(b)
+    current_b = next(b, None)
+
+    for start, end in a:
+        while current_b is not None and current_b[1] < start:
+            current_b = next(b, None)
+
+        while current_b is not None and current_b[0] <= end:
+            if current_b[0] > start:
+                yield start, current_b[0] - 1
+
+            if current_b[1] >= end:
+                start = end + 1
+                break
+
+            start = current_b[1] + 1
+            current_b = next(b, None)
+
+        if start <= end:
+            yield start, end
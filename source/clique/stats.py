@@ -0,0 +1,113 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+'''Statistics describing where time is spent during assembly.'''
+
+import time
+
+try:
+    clock = time.perf_counter
+except AttributeError:
+    clock = time.time
+
+
+class AssemblyStats(object):
+    '''Record counts and timings of each phase of assembly.
+
+    Pass an instance to :py:func:`~clique.assemble` or
+    :py:class:`~clique.Assembler` to have it updated as items are
+    assembled::
+
+        >>> stats = AssemblyStats()
+        >>> collections, remainder = clique.assemble(items, stats=stats)
+        >>> print stats.timings['scan'], stats.keys, stats.remainder
+        0.0153 412 3
+
+    Values accumulate over every use of the same instance, such as across
+    many directories when scanning, until :py:meth:`reset` is called.
+
+    The following phases are timed, in seconds, in :py:attr:`timings`:
+
+        * *scan* - Matching items against patterns or runs of digits.
+        * *construct* - Constructing a collection for each candidate key.
+        * *merge* - Merging collections that align on padding boundaries.
+        * *filter* - Filtering collections by minimum items and computing
+          the remainder.
+        * *padding* - Resolving padding of ambiguous collections.
+
+    '''
+
+    #: Names of phases timed, in the order they occur.
+    PHASES = ('scan', 'construct', 'merge', 'filter', 'padding')
+
+    def __init__(self):
+        '''Initialise with all counts and timings zero.'''
+        super(AssemblyStats, self).__init__()
+        self.reset()
+
+    def __repr__(self):
+        '''Return representation.'''
+        return '<{0} {1}>'.format(self.__class__.__name__, self.as_dict())
+
+    def reset(self):
+        '''Reset all counts and timings to zero.'''
+        #: Number of items processed.
+        self.items = 0
+
+        #: Number of items that did not match any pattern or contain digits.
+        self.unmatched = 0
+
+        #: Number of possible indexes found in items.
+        self.matches = 0
+
+        #: Number of distinct (head, tail, padding) candidate keys.
+        self.keys = 0
+
+        #: Number of collections merged into a collection with padding.
+        self.merges = 0
+
+        #: Number of collections discarded for having too few items.
+        self.filtered = 0
+
+        #: Number of collections returned.
+        self.collections = 0
+
+        #: Number of items in the remainder.
+        self.remainder = 0
+
+        #: Number of ambiguous collections assigned padding.
+        self.ambiguous = 0
+
+        #: Mapping of phase name to total time spent in seconds.
+        self.timings = dict((phase, 0.0) for phase in self.PHASES)
+
+    def add(self, stats):
+        '''Add counts and timings from other *stats* to these.'''
+        for key, value in stats.as_dict().items():
+            if key == 'timings':
+                for phase, duration in value.items():
+                    self.timings[phase] = (
+                        self.timings.get(phase, 0.0) + duration
+                    )
+            else:
+                setattr(self, key, getattr(self, key) + value)
+
+    def as_dict(self):
+        '''Return dictionary of all counts and timings.
+
+        Useful for passing on to a metrics system.
+
+        '''
+        return dict(
+            items=self.items,
+            unmatched=self.unmatched,
+            matches=self.matches,
+            keys=self.keys,
+            merges=self.merges,
+            filtered=self.filtered,
+            collections=self.collections,
+            remainder=self.remainder,
+            ambiguous=self.ambiguous,
+            timings=dict(self.timings)
+        )
@@ -0,0 +1,148 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import sys
+
+import pytest
+
+if sys.version_info < (3, 6):
+    pytest.skip('Requires Python 3.6 or later.', allow_module_level=True)
+
+import asyncio
+import concurrent.futures
+
+import clique
+import clique.aio
+
+
+class AsyncItems(object):
+    '''Asynchronous iterable over items for test.'''
+
+    def __init__(self, items):
+        '''Initialise with *items*.'''
+        self.items = iter(items)
+
+    def __aiter__(self):
+        '''Return asynchronous iterator.'''
+        return self
+
+    def __anext__(self):
+        '''Return awaitable for next item.'''
+        future = asyncio.get_event_loop().create_future()
+        try:
+            future.set_result(next(self.items))
+        except StopIteration:
+            future.set_exception(StopAsyncIteration())
+
+        return future
+
+
+@pytest.fixture()
+def loop():
+    '''Return new event loop.'''
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+def collect(loop, generator):
+    '''Return list of results from asynchronous *generator*.'''
+    results = []
+    while True:
+        try:
+            results.append(loop.run_until_complete(generator.__anext__()))
+        except StopAsyncIteration:
+            return results
+
+
+ITEMS = [
+    'file.0001.jpg', 'file.0002.jpg', 'file.0003.jpg', 'notes.txt',
+    'shot_010.1001.exr', 'shot_010.1002.exr', 'shot_020.1001.exr',
+    'file.0005.jpg', 'file.9.jpg'
+]
+
+
+@pytest.mark.parametrize('iterable', [
+    AsyncItems, list
+], ids=[
+    'asynchronous iterable',
+    'iterable'
+])
+@pytest.mark.parametrize('batch_size', [1, 3, 1000])
+def test_assemble(loop, iterable, batch_size):
+    '''Assemble items with same result as synchronous assembly.'''
+    collections, remainder = loop.run_until_complete(
+        clique.aio.assemble(
+            iterable(ITEMS), batch_size=batch_size, minimum_items=2
+        )
+    )
+    expected_collections, expected_remainder = clique.assemble(
+        ITEMS, minimum_items=2
+    )
+    assert sorted(collections) == sorted(expected_collections)
+    assert sorted(remainder) == sorted(expected_remainder)
+
+
+def test_assemble_with_executor(loop):
+    '''Assemble items using specific executor.'''
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        collections, remainder = loop.run_until_complete(
+            clique.aio.assemble(AsyncItems(ITEMS), executor=executor)
+        )
+
+    assert sorted(collections) == sorted(clique.assemble(ITEMS)[0])
+
+
+def test_assemble_does_not_block(loop):
+    '''Allow other tasks to run whilst assembling.'''
+    items = ['file.{0:04d}.jpg'.format(index) for index in range(1, 10000)]
+    ticks = []
+    handles = []
+
+    def tick():
+        '''Record tick and schedule next.'''
+        ticks.append(None)
+        handles.append(loop.call_later(0.001, tick))
+
+    tick()
+    collections, _ = loop.run_until_complete(
+        clique.aio.assemble(AsyncItems(items), batch_size=1000)
+    )
+    handles[-1].cancel()
+
+    assert len(collections) == 1
+    assert len(ticks) > 1
+
+
+def test_scan(loop, tmpdir):
+    '''Scan directory tree asynchronously.'''
+    for index in range(1, 4):
+        tmpdir.join('file.{0:04d}.exr'.format(index)).write('')
+
+    tmpdir.mkdir('shot').join('plate.1.dpx').write('')
+
+    results = collect(
+        loop, clique.aio.scan(str(tmpdir), recursive=True, stat=True)
+    )
+    expected = list(clique.scan(str(tmpdir), recursive=True, stat=True))
+    assert [result.path for result in results] == [
+        result.path for result in expected
+    ]
+    assert [result.collections for result in results] == [
+        result.collections for result in expected
+    ]
+    assert results[0].stats == expected[0].stats
+
+
+def test_scan_error(loop, tmpdir):
+    '''Report directories that cannot be listed when scanning.'''
+    errors = []
+    results = collect(
+        loop, clique.aio.scan(str(tmpdir.join('missing')),
+                              onerror=errors.append)
+    )
+    assert results == []
+    assert len(errors) == 1
@@ -0,0 +1,189 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import pickle
+
+import pytest
+
+import clique.array_set
+from clique.array_set import ArraySortedSet
+from clique.collection import Collection
+from clique.sorted_set import SortedSet
+
+numpy = pytest.importorskip('numpy')
+
+
+def test_preferred_storage():
+    '''Prefer array storage when NumPy is available.'''
+    assert clique.array_set.preferred_storage() is ArraySortedSet
+
+
+def test_preferred_storage_fallback(monkeypatch):
+    '''Fall back to sorted set storage when NumPy is unavailable.'''
+    monkeypatch.setattr(clique.array_set, 'numpy', None)
+    assert clique.array_set.preferred_storage() is SortedSet
+
+
+@pytest.mark.parametrize(('sorted_set', 'expected'), [
+    (ArraySortedSet(), []),
+    (ArraySortedSet([3, 1, 2, 2]), [1, 2, 3]),
+    (ArraySortedSet(SortedSet([5, 1, 2])), [1, 2, 5]),
+    (ArraySortedSet(numpy.array([4, 4, 1])), [1, 4])
+], ids=[
+    'empty',
+    'unsorted duplicate items',
+    'sorted set',
+    'array'
+])
+def test_iter(sorted_set, expected):
+    '''Iterate over ordered items.'''
+    assert list(sorted_set) == expected
+    assert len(sorted_set) == len(expected)
+
+
+@pytest.mark.parametrize(('item', 'expected'), [
+    (1, True),
+    (4, False),
+    (10, False)
+], ids=[
+    'item present',
+    'item not present',
+    'item beyond end'
+])
+def test_contains(item, expected):
+    '''Check item membership.'''
+    assert (item in ArraySortedSet([1, 2, 3, 5])) is expected
+
+
+def test_add_and_discard():
+    '''Add and discard items.'''
+    sorted_set = ArraySortedSet([1, 5])
+    sorted_set.add(3)
+    sorted_set.add(3)
+    assert list(sorted_set) == [1, 3, 5]
+
+    sorted_set.discard(1)
+    sorted_set.discard(2)
+    assert list(sorted_set) == [3, 5]
+
+
+def test_ranges():
+    '''Add and discard ranges of items.'''
+    sorted_set = ArraySortedSet()
+    sorted_set.add_range(1, 10)
+    sorted_set.discard_range(3, 5)
+    sorted_set.discard_range(9, 20)
+    assert list(sorted_set.runs()) == [(1, 2), (6, 8)]
+
+    sorted_set.add_range(2, 4)
+    sorted_set.add_range(7, 7)
+    sorted_set.add_range(12, 11)
+    assert list(sorted_set.runs()) == [(1, 4), (6, 8)]
+
+
+@pytest.mark.parametrize(('operator', 'expected'), [
+    ('__or__', [1, 2, 3, 4, 5, 6]),
+    ('__and__', [3, 4]),
+    ('__sub__', [1, 2]),
+    ('__xor__', [1, 2, 5, 6])
+], ids=[
+    'union',
+    'intersection',
+    'difference',
+    'symmetric difference'
+])
+@pytest.mark.parametrize(('other'), [
+    ArraySortedSet([3, 4, 5, 6]),
+    SortedSet([3, 4, 5, 6]),
+    set([3, 4, 5, 6])
+], ids=[
+    'array sorted set',
+    'sorted set',
+    'set'
+])
+def test_set_operations(operator, other, expected):
+    '''Perform set operations.'''
+    sorted_set = ArraySortedSet([1, 2, 3, 4])
+    result = getattr(sorted_set, operator)(other)
+    assert isinstance(result, ArraySortedSet)
+    assert list(result) == expected
+    assert list(sorted_set) == [1, 2, 3, 4]
+
+    in_place_operator = operator.replace('__', '__i', 1)
+    result = getattr(sorted_set, in_place_operator)(other)
+    assert result is sorted_set
+    assert list(sorted_set) == expected
+
+
+def test_array_view():
+    '''Export read only view of members without copying.'''
+    sorted_set = ArraySortedSet([1, 2, 3])
+    array = sorted_set.array()
+    assert array.dtype == numpy.int64
+    assert array.tolist() == [1, 2, 3]
+
+    with pytest.raises(ValueError):
+        array[0] = 10
+
+
+def test_collection_storage():
+    '''Store collection indexes in array.'''
+    collection = Collection(
+        'head.', '.tail', 4, indexes=set([1, 2, 3, 7]), storage=ArraySortedSet
+    )
+    assert isinstance(collection.indexes, ArraySortedSet)
+    assert collection.format() == 'head.%04d.tail [1-3, 7]'
+    assert collection.indexes == set([1, 2, 3, 7])
+    assert 'head.0002.tail' in collection
+
+    holes = collection.holes()
+    assert isinstance(holes.indexes, ArraySortedSet)
+    assert holes.indexes == set([4, 5, 6])
+
+    parts = collection.separate()
+    assert [isinstance(part.indexes, ArraySortedSet) for part in parts] == [
+        True, True
+    ]
+
+    array = collection.indexes_array()
+    assert numpy.shares_memory(array, collection.indexes._members)
+
+
+def test_collection_indexes_array():
+    '''Export sorted set indexes as array.'''
+    collection = Collection('head.', '.tail', 4, indexes=set([1, 2, 3, 7]))
+    array = collection.indexes_array()
+    assert array.dtype == numpy.int64
+    assert array.tolist() == [1, 2, 3, 7]
+
+
+def test_collection_many_holes():
+    '''Compute many holes of collection with array storage.'''
+    collection = Collection(
+        'head.', '.tail', 4, indexes=range(1, 20000, 2),
+        storage=ArraySortedSet
+    )
+    holes = collection.holes()
+    assert isinstance(holes.indexes, ArraySortedSet)
+    assert list(holes.indexes) == list(range(2, 19999, 2))
+
+
+def test_pickle():
+    '''Pickle and restore set.'''
+    sorted_set = ArraySortedSet([1, 2, 5])
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        restored = pickle.loads(pickle.dumps(sorted_set, protocol))
+        assert restored == sorted_set
+
+        restored.add(3)
+        assert list(restored) == [1, 2, 3, 5]
+
+
+def test_no_instance_dictionary():
+    '''Store attributes in slots rather than an instance dictionary.'''
+    sorted_set = ArraySortedSet([1, 2, 5])
+    assert not hasattr(sorted_set, '__dict__')
+
+    with pytest.raises(AttributeError):
+        sorted_set.other = True
@@ -0,0 +1,154 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import io
+
+import pytest
+
+import clique.binary
+from clique.collection import Collection
+
+
+@pytest.mark.parametrize('collection', [
+    Collection('head.', '.tail', 0),
+    Collection('head.', '.tail', 4, indexes=set([1])),
+    Collection('head.', '.tail', 4, indexes=set([1, 2, 3, 5, 10, 11])),
+    Collection('', '', 0, indexes=set([0, 300, 70000, 70001])),
+    Collection('head.', '.tail', 0, indexes=set([-5, -4, -1, 1])),
+    Collection(u'héad.', u'.tâil', 2, indexes=set([1, 2])),
+    Collection('head.', '.tail', 0, indexes=set([2 ** 70, 2 ** 70 + 1]))
+], ids=[
+    'empty',
+    'single index',
+    'multiple runs',
+    'empty head and tail',
+    'negative indexes',
+    'unicode head and tail',
+    'large indexes'
+])
+def test_round_trip(collection):
+    '''Encode and decode collection.'''
+    data = clique.binary.to_bytes(collection)
+    assert isinstance(data, bytes)
+
+    decoded = clique.binary.from_bytes(data)
+    assert decoded == collection
+    assert list(decoded.indexes.runs()) == list(collection.indexes.runs())
+
+
+def test_compact():
+    '''Encode large contiguous range in few bytes.'''
+    collection = Collection(
+        'head.', '.tail', 4, indexes=range(1, 1000001)
+    )
+    assert len(clique.binary.to_bytes(collection)) < 32
+
+
+def test_from_bytes_storage():
+    '''Decode collection using specific storage.'''
+    class Storage(clique.sorted_set.SortedSet):
+        '''Custom storage.'''
+
+    collection = Collection('head.', '.tail', 0, indexes=set([1, 2]))
+    decoded = clique.binary.from_bytes(
+        clique.binary.to_bytes(collection), storage=Storage
+    )
+    assert isinstance(decoded.indexes, Storage)
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'XYZ\x01',
+    b'CLQ',
+    b'CLQ\x02',
+    b'CLQ\x01\x00\x05hea',
+    b'CLQ\x01\x00\x01h\x00\x01t\x00\x01',
+    b'CLQ\x01\x00\x01h\x00\x01t\x00\x00\x00',
+    b'CLQ\x01\x02\x01h\x00\x01t\x00\x00'
+], ids=[
+    'empty',
+    'invalid magic',
+    'missing version',
+    'unsupported version',
+    'truncated head',
+    'truncated runs',
+    'trailing data',
+    'invalid shared prefix'
+])
+def test_from_bytes_invalid(data):
+    '''Fail to decode invalid data.'''
+    with pytest.raises(ValueError):
+        clique.binary.from_bytes(data)
+
+
+def test_stream():
+    '''Write and read many collections using stream.'''
+    collections = [
+        Collection('head.', '.tail', 0),
+        Collection('file.', '.exr', 4, indexes=set([1, 2, 3, 9])),
+        Collection('plate_', '.dpx', 0, indexes=set([1001, 1002]))
+    ]
+
+    stream = io.BytesIO()
+    writer = clique.binary.Writer(stream)
+    writer.write(collections[0])
+    writer.write_many(collections[1:])
+
+    stream.seek(0)
+    reader = clique.binary.Reader(stream)
+    assert list(reader) == collections
+    assert reader.read() is None
+
+
+def test_stream_empty():
+    '''Read stream without collections.'''
+    stream = io.BytesIO()
+    clique.binary.Writer(stream)
+
+    stream.seek(0)
+    assert list(clique.binary.Reader(stream)) == []
+
+
+def test_stream_truncated():
+    '''Fail to read truncated stream.'''
+    stream = io.BytesIO()
+    clique.binary.Writer(stream).write(
+        Collection('file.', '.exr', 4, indexes=set([1, 2, 3, 9]))
+    )
+
+    stream = io.BytesIO(stream.getvalue()[:-2])
+    reader = clique.binary.Reader(stream)
+    with pytest.raises(ValueError):
+        reader.read()
+
+
+def test_stream_invalid_header():
+    '''Fail to read stream with invalid header.'''
+    with pytest.raises(ValueError):
+        clique.binary.Reader(io.BytesIO(b'nope'))
+
+
+def test_stream_shared_prefix():
+    '''Store only differing part of head and tail when streaming.'''
+    collections = [
+        Collection(
+            '/show/seq/shot/render/beauty_v{0:03d}.'.format(index), '.exr', 4,
+            indexes=set([1, 2, 3])
+        )
+        for index in range(100)
+    ]
+    collections.append(Collection(u'/show/seq/shot\u00e9.', '.exr', 0))
+    collections.append(Collection(u'/show/seq/shot\u00e8.', '.exr', 0))
+
+    stream = io.BytesIO()
+    clique.binary.Writer(stream).write_many(collections)
+
+    single = sum(
+        len(clique.binary.to_bytes(collection))
+        for collection in collections
+    )
+    assert len(stream.getvalue()) < single / 2
+
+    stream.seek(0)
+    assert list(clique.binary.Reader(stream)) == collections
@@ -0,0 +1,46 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+from clique.cache import LruCache, CacheInfo
+
+
+def test_get():
+    '''Compute value only when missing from cache.'''
+    calls = []
+
+    def factory(key):
+        calls.append(key)
+        return key * 2
+
+    cache = LruCache()
+    assert cache.get(2, factory) == 4
+    assert cache.get(2, factory) == 4
+    assert calls == [2]
+
+
+def test_evict_least_recently_used():
+    '''Evict least recently used value when full.'''
+    cache = LruCache(maxsize=2)
+    cache.get('a', str.upper)
+    cache.get('b', str.upper)
+    cache.get('a', str.upper)
+    cache.get('c', str.upper)
+
+    assert cache.info() == CacheInfo(hits=1, misses=3, maxsize=2, currsize=2)
+
+    cache.get('a', str.upper)
+    assert cache.info().hits == 2
+
+    cache.get('b', str.upper)
+    assert cache.info().misses == 4
+
+
+def test_clear():
+    '''Clear values and statistics.'''
+    cache = LruCache()
+    cache.get('a', str.upper)
+    cache.get('a', str.upper)
+    cache.clear()
+
+    assert cache.info() == CacheInfo(hits=0, misses=0, maxsize=128, currsize=0)
@@ -0,0 +1,171 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import pytest
+
+import clique.catalogue
+from clique.collection import Collection
+
+
+COLLECTIONS = [
+    Collection('/show/shot_010/plate.', '.exr', 4, indexes=set([1, 2, 3, 7])),
+    Collection('/show/shot_010/plate.', '.exr', 0, indexes=set([1001, 1002])),
+    Collection('/show/shot_020/plate.', '.exr', 4, indexes=set([1, 2])),
+    Collection('/show/shot_020/plate.', '.dpx', 0, indexes=set([5, 6])),
+    Collection('/show/v', '/render.exr', 0, indexes=set([1, 2, 3])),
+    Collection(u'/show/é.', '.exr', 2, indexes=set([10, 11]))
+]
+
+
+@pytest.fixture()
+def catalogue(tmpdir):
+    '''Return open catalogue of collections.'''
+    path = str(tmpdir.join('show.clqc'))
+    clique.catalogue.write(path, COLLECTIONS)
+
+    catalogue = clique.catalogue.Catalogue(path)
+    yield catalogue
+    catalogue.close()
+
+
+def test_iterate(catalogue):
+    '''Iterate over all collections in catalogue.'''
+    assert len(catalogue) == len(COLLECTIONS)
+    assert sorted(catalogue) == sorted(COLLECTIONS)
+
+
+@pytest.mark.parametrize('collection', COLLECTIONS, ids=[
+    'padded', 'unpadded', 'other head', 'other tail', 'digits in head',
+    'unicode head'
+])
+def test_lookup(catalogue, collection):
+    '''Look up collection by head, tail and padding.'''
+    result = catalogue.lookup(
+        collection.head, collection.tail, collection.padding
+    )
+    assert result == collection
+
+
+@pytest.mark.parametrize(('head', 'tail', 'padding'), [
+    ('/show/shot_010/plate.', '.exr', 3),
+    ('/show/shot_030/plate.', '.exr', 4),
+    ('', '', 0),
+    ('~', '~', 0)
+], ids=[
+    'different padding',
+    'different head',
+    'before first',
+    'after last'
+])
+def test_lookup_missing(catalogue, head, tail, padding):
+    '''Look up collection that is not present.'''
+    assert catalogue.lookup(head, tail, padding) is None
+
+
+def test_lookup_returns_copy(catalogue):
+    '''Modify looked up collection without affecting catalogue.'''
+    collection = catalogue.lookup('/show/shot_020/plate.', '.exr', 4)
+    collection.indexes.add(3)
+
+    assert catalogue.lookup(
+        '/show/shot_020/plate.', '.exr', 4
+    ).indexes == set([1, 2])
+
+
+@pytest.mark.parametrize(('item', 'expected'), [
+    ('/show/shot_010/plate.0001.exr', True),
+    ('/show/shot_010/plate.0007.exr', True),
+    ('/show/shot_010/plate.0004.exr', False),
+    ('/show/shot_010/plate.1001.exr', True),
+    ('/show/shot_010/plate.001.exr', False),
+    ('/show/shot_020/plate.6.dpx', True),
+    ('/show/shot_020/plate.06.dpx', False),
+    ('/show/v2/render.exr', True),
+    ('/show/v4/render.exr', False),
+    (u'/show/é.11.exr', True),
+    ('/show/shot_030/plate.0001.exr', False),
+    ('/show/readme.txt', False)
+], ids=[
+    'padded member',
+    'padded member after hole',
+    'padded hole',
+    'unpadded member',
+    'wrong padding',
+    'unpadded tail',
+    'unexpected padding',
+    'digits in head',
+    'missing index in head',
+    'unicode head',
+    'unknown head',
+    'no digits'
+])
+def test_contains(catalogue, item, expected):
+    '''Check whether item is member of collection in catalogue.'''
+    assert catalogue.contains(item) == expected
+    assert catalogue.contains(item) == expected
+
+
+@pytest.mark.parametrize(('item', 'expected'), [
+    ('/show/v1001.exr', True),
+    ('/show/v1005.exr', False),
+    ('/show/shot_010/plate.0001.exr', True)
+], ids=[
+    'member',
+    'non member',
+    'other collection'
+])
+def test_contains_digits_in_head(tmpdir, item, expected):
+    '''Check membership where head of collection ends with digit.'''
+    path = str(tmpdir.join('show.clqc'))
+    clique.catalogue.write(path, COLLECTIONS + [
+        Collection('/show/v1', '.exr', 3, indexes=set([1, 2]))
+    ])
+
+    with clique.catalogue.Catalogue(path) as catalogue:
+        assert catalogue.contains(item) == expected
+
+
+def test_merge_duplicates(tmpdir):
+    '''Merge collections with same head, tail and padding when writing.'''
+    path = str(tmpdir.join('show.clqc'))
+    clique.catalogue.write(path, [
+        Collection('file.', '.exr', 4, indexes=set([1, 2])),
+        Collection('file.', '.exr', 4, indexes=set([5]))
+    ])
+
+    with clique.catalogue.Catalogue(path) as catalogue:
+        assert len(catalogue) == 1
+        assert catalogue.lookup('file.', '.exr', 4).indexes == set([1, 2, 5])
+
+
+def test_empty(tmpdir):
+    '''Open empty catalogue.'''
+    path = str(tmpdir.join('empty.clqc'))
+    clique.catalogue.write(path, [])
+
+    with clique.catalogue.Catalogue(path) as catalogue:
+        assert len(catalogue) == 0
+        assert list(catalogue) == []
+        assert catalogue.lookup('file.', '.exr', 4) is None
+        assert not catalogue.contains('file.0001.exr')
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'not a catalogue file',
+    b'CLQCAT\x02\x00' + b'\x00' * 8,
+    b'CLQCAT\x01\x00\x05' + b'\x00' * 7
+], ids=[
+    'empty',
+    'invalid magic',
+    'unsupported version',
+    'truncated table'
+])
+def test_invalid(tmpdir, data):
+    '''Fail to open invalid catalogue.'''
+    path = tmpdir.join('invalid.clqc')
+    path.write_binary(data)
+
+    with pytest.raises(ValueError):
+        clique.catalogue.Catalogue(str(path))
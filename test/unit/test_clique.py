@@ -53,6 +53,26 @@ def test_assemble():
     assert sorted(remainder) == sorted(expected)
 
 
+@pytest.mark.parametrize(('case_sensitive'), [True, False], ids=[
+    'case sensitive',
+    'case insensitive'
+])
+def test_assemble_digits_pattern_equivalence(case_sensitive):
+    '''Assemble without patterns matching explicit digits pattern.'''
+    items = [
+        'file.ext', '1', '3', '001', '003', '0', '00', '10',
+        'head.001.tail', 'HEAD.002.tail', 'head.1.tail', 'head.2.tail',
+        'head1_010_v1.0001.tail', 'head1_010_v2.0001.tail',
+        '/path/01/file.0998.ext', '/path/01/file.0999.ext',
+        '/path/02/file.1000.ext'
+    ]
+
+    expected = clique.assemble(
+        items, patterns=[clique.DIGITS_PATTERN], case_sensitive=case_sensitive
+    )
+    assert clique.assemble(items, case_sensitive=case_sensitive) == expected
+
+
 def test_assemble_case_sensitive():
     '''Assemble collections respecting casing.'''
     collections, _ = clique.assemble(
@@ -242,6 +262,264 @@ def test_assemble_assume_padded(items, assume_padded, expected):
     assert collections == expected
 
 
+def test_assembler_feed_batches():
+    '''Assemble items fed in batches.'''
+    items = [
+        'file.ext',
+        'head.001.tail', 'head.002.tail',
+        'head.1.tail', 'head.2.tail',
+        'head_v01.tail', 'head_v1.tail', 'head_v2.tail',
+        '0999', '1000', '1001', '999'
+    ]
+
+    assembler = clique.Assembler()
+    for index in range(0, len(items), 3):
+        assembler.feed(items[index:index + 3])
+
+    collections, remainder = clique.assemble(items)
+    assert sorted(assembler.collections()) == sorted(collections)
+    assert sorted(assembler.remainder()) == sorted(remainder)
+
+
+def test_assembler_partial_results():
+    '''Query assembler results between batches.'''
+    assembler = clique.Assembler(minimum_items=2)
+
+    assembler.feed(['head.0001.tail'])
+    assert assembler.collections() == []
+    assert assembler.remainder() == ['head.0001.tail']
+
+    assembler.feed(['head.0002.tail', 'file.ext'])
+    assert assembler.collections() == [
+        clique.Collection('head.', '.tail', 4, indexes=set([1, 2]))
+    ]
+    assert assembler.remainder() == ['file.ext']
+
+    assembler.feed(['head.0003.tail'])
+    assert assembler.collections() == [
+        clique.Collection('head.', '.tail', 4, indexes=set([1, 2, 3]))
+    ]
+
+
+def test_assembler_query_between_batches():
+    '''Query assembler between batches affecting only some collections.'''
+    items = [
+        'a.0001.exr', 'a.0002.exr', 'b.1.exr', 'b.2.exr', 'b_v1.exr',
+        'c.0999.exr', 'c.1000.exr', 'd.1.exr', 'b_v2.exr', 'c.1001.exr',
+        'a.0003.exr', 'e.1.exr', 'c.999.exr', 'd.2.exr'
+    ]
+
+    assembler = clique.Assembler()
+    for index in range(0, len(items), 2):
+        assembler.feed(items[index:index + 2])
+        collections, remainder = clique.assemble(items[:index + 2])
+        assert sorted(assembler.collections()) == sorted(collections)
+        assert sorted(assembler.remainder()) == sorted(remainder)
+
+    # Collections with a head and tail not fed again are not formed again.
+    collections = assembler.collections()
+    assembler.feed(['a.0004.exr'])
+    unchanged = [
+        collection for collection in collections
+        if collection.head != 'a.'
+    ]
+    for collection in unchanged:
+        assert any(
+            collection is other for other in assembler.collections()
+        )
+
+
+def test_assembler_no_patterns():
+    '''Feed assembler with no patterns.'''
+    assembler = clique.Assembler(patterns=[])
+    assembler.feed(['1', '2'])
+    assert assembler.collections() == []
+    assert assembler.remainder() == ['1', '2']
+
+
+@pytest.mark.parametrize(('components', 'expected'), [
+    (1, [
+        '/show/sq010/v001/plate.%d.exr [1001-1002]',
+        '/show/sq010/v002/plate.%d.exr [1001-1003]'
+    ]),
+    (2, [
+        '/show/sq010/v%03d/plate.1001.exr [1-2]',
+        '/show/sq010/v%03d/plate.1002.exr [1-2]',
+        '/show/sq010/v001/plate.%d.exr [1001-1002]',
+        '/show/sq010/v002/plate.%d.exr [1001-1003]'
+    ]),
+    (None, [
+        '/show/sq010/v%03d/plate.1001.exr [1-2]',
+        '/show/sq010/v%03d/plate.1002.exr [1-2]',
+        '/show/sq010/v001/plate.%d.exr [1001-1002]',
+        '/show/sq010/v002/plate.%d.exr [1001-1003]'
+    ])
+], ids=[
+    'last',
+    'last two',
+    'all'
+])
+def test_assemble_components(components, expected):
+    '''Assemble considering only last runs of digits in each item.'''
+    items = [
+        '/show/sq010/v001/plate.1001.exr', '/show/sq010/v001/plate.1002.exr',
+        '/show/sq010/v002/plate.1001.exr', '/show/sq010/v002/plate.1002.exr',
+        '/show/sq010/v002/plate.1003.exr', '/show/sq010/notes.txt'
+    ]
+    collections, remainder = clique.assemble(items, components=components)
+
+    assert sorted(str(collection) for collection in collections) == expected
+    assert remainder == ['/show/sq010/notes.txt']
+
+
+def test_assemble_components_remainder():
+    '''Include items only grouped by earlier runs of digits in remainder.'''
+    items = ['v1/file.0001.exr', 'v2/file.0001.exr']
+    assert clique.assemble(items)[1] == []
+    assert clique.assemble(items, components=1) == ([], items)
+
+
+@pytest.mark.parametrize('components', [0, -1])
+def test_assemble_invalid_components(components):
+    '''Fail to assemble with invalid components.'''
+    with pytest.raises(ValueError):
+        clique.assemble(['file.0001.exr'], components=components)
+
+
+@pytest.mark.parametrize(('items', 'minimum_items', 'expected', 'remainder'), [
+    (
+        [
+            'v001/plate.1001.exr', 'v001/plate.1002.exr',
+            'v002/plate.1001.exr', 'v002/plate.1002.exr',
+            'v002/plate.1003.exr', 'notes.txt'
+        ],
+        2,
+        ['v001/plate.%d.exr [1001-1002]', 'v002/plate.%d.exr [1001-1003]'],
+        ['notes.txt']
+    ),
+    (
+        ['a1b1', 'a1b2', 'a2b1', 'a2b2'],
+        2,
+        ['a1b%d [1-2]', 'a2b%d [1-2]'],
+        []
+    ),
+    (
+        ['a1b1', 'a2b1', 'a3b1', 'a1b2', 'a1b3'],
+        2,
+        ['a%db1 [2-3]', 'a1b%d [1-3]'],
+        []
+    ),
+    (
+        ['a1b1', 'a2b1', 'a3b1', 'a1b2'],
+        2,
+        ['a%db1 [1-3]'],
+        ['a1b2']
+    ),
+    (
+        ['a1b1', 'a2b1', 'a3b1', 'a1b2', 'a1b3', 'a1b4'],
+        3,
+        ['a1b%d [1-4]'],
+        ['a2b1', 'a3b1']
+    ),
+    (
+        ['head.0998.tail', 'head.0999.tail', 'head.1000.tail',
+         'head.1001.tail', 'head.10000.tail', 'head.10001.tail'],
+        2,
+        ['head.%04d.tail [998-1001]', 'head.%d.tail [10000-10001]'],
+        []
+    )
+], ids=[
+    'versions and frames',
+    'tie prefers rightmost',
+    'remaining members',
+    'remaining below minimum items',
+    'remaining below larger minimum items',
+    'padding boundary'
+])
+def test_assemble_exclusive(items, minimum_items, expected, remainder):
+    '''Assemble with each item in at most one collection.'''
+    collections, result_remainder = clique.assemble(
+        items, minimum_items=minimum_items, exclusive=True
+    )
+
+    assert sorted(str(collection) for collection in collections) == expected
+    assert sorted(result_remainder) == remainder
+
+    members = [item for collection in collections for item in collection]
+    assert len(members) == len(set(members))
+
+
+def test_assembler_exclusive_batches():
+    '''Assemble exclusively with items fed in batches.'''
+    items = ['a1b1', 'a2b1', 'a3b1', 'a1b2', 'a1b3', 'c.ext']
+    assembler = clique.Assembler(exclusive=True)
+    for item in items:
+        assembler.feed([item])
+
+    assert assembler.collections() == clique.assemble(
+        items, exclusive=True
+    )[0]
+    assert assembler.remainder() == ['c.ext']
+
+
+@pytest.mark.parametrize(('iterable'), [list, iter], ids=[
+    'list',
+    'iterator'
+])
+def test_assemble_stats(iterable):
+    '''Record statistics whilst assembling.'''
+    items = [
+        'file.ext', 'single.1.ext',
+        'head.0998.tail', 'head.0999.tail', 'head.1000.tail', 'head.1001.tail'
+    ]
+    stats = clique.AssemblyStats()
+    collections, remainder = clique.assemble(iterable(items), stats=stats)
+
+    assert collections == clique.assemble(items)[0]
+    assert stats.items == 6
+    assert stats.unmatched == 1
+    assert stats.matches == 5
+    assert stats.keys == 3
+    assert stats.merges == 1
+    assert stats.filtered == 1
+    assert stats.collections == 1
+    assert stats.remainder == 2
+    assert stats.ambiguous == 0
+    assert sorted(stats.timings) == sorted(clique.AssemblyStats.PHASES)
+    assert all(duration >= 0 for duration in stats.timings.values())
+
+
+def test_assemble_stats_ambiguous():
+    '''Record number of ambiguous collections assigned padding.'''
+    stats = clique.AssemblyStats()
+    clique.assemble(
+        ['head.1000.tail', 'head.1001.tail', 'other.1.tail', 'other.20.tail'],
+        assume_padded_when_ambiguous=True, stats=stats
+    )
+    assert stats.ambiguous == 1
+
+
+def test_assembler_stats_accumulate():
+    '''Accumulate statistics over batches and results.'''
+    stats = clique.AssemblyStats()
+    assembler = clique.Assembler(stats=stats)
+
+    assembler.feed(['head.0001.tail', 'file.ext'])
+    assembler.feed(['head.0002.tail'])
+    assert stats.items == 3
+    assert stats.unmatched == 1
+
+    assembler.collections()
+    assembler.remainder()
+    assert stats.collections == 1
+
+    assembler.feed(['head.0003.tail'])
+    assembler.collections()
+    assert stats.items == 4
+    assert stats.matches == 3
+    assert stats.collections == 2
+
+
 @pytest.mark.parametrize(('value', 'pattern', 'expected'), [
     ('/path/to/file.%04d.ext []', None,
      clique.Collection('/path/to/file.', '.ext', 4, [])),
@@ -254,13 +532,17 @@ def test_assemble_assume_padded(items, assume_padded, expected):
      clique.Collection('/path/to/file.', '.ext', 0, [1, 2, 3, 4, 5, 6, 7, 8])),
     ('/path/to/file.%d.ext 1-8 [2, 4-6]',
      '{head}{padding}{tail} {range} [{holes}]',
-     clique.Collection('/path/to/file.', '.ext', 0, [1, 3, 7, 8]))
+     clique.Collection('/path/to/file.', '.ext', 0, [1, 3, 7, 8])),
+    ('/path/to/file.%d.ext [1-3, 5, 7-10] [2, 8-9]',
+     '{head}{padding}{tail} [{ranges}] [{holes}]',
+     clique.Collection('/path/to/file.', '.ext', 0, [1, 3, 5, 7, 10]))
 ], ids=[
     'empty',
     'padded',
     'unpadded',
     'custom range pattern',
-    'custom holes pattern'
+    'custom holes pattern',
+    'custom ranges and holes pattern'
 ])
 def test_parse(value, pattern, expected):
     '''Construct collection by parsing formatted string.'''
@@ -270,7 +552,53 @@ def test_parse(value, pattern, expected):
         assert clique.parse(value, pattern=pattern) == expected
 
 
+def test_parse_large_range():
+    '''Parse large range without expanding indexes.'''
+    collection = clique.parse(
+        'shot.%08d.exr [1-5000000]', pattern='{head}{padding}{tail} [{range}]'
+    )
+    assert len(collection.indexes) == 5000000
+    assert list(collection.indexes.runs()) == [(1, 5000000)]
+
+
 def test_non_matching_parse():
     '''Fail to parse non-matching value.'''
     with pytest.raises(ValueError):
-        clique.parse('')
\ No newline at end of file
+        clique.parse('')
+
+
+def test_parse_many():
+    '''Parse many values with the same pattern.'''
+    collections = clique.parse_many(
+        ['/path/to/file.%04d.ext [1-3]', '/path/to/other.%d.ext [1, 5]'],
+        pattern='{head}{padding}{tail} [{ranges}]'
+    )
+    assert list(collections) == [
+        clique.Collection('/path/to/file.', '.ext', 4, [1, 2, 3]),
+        clique.Collection('/path/to/other.', '.ext', 0, [1, 5])
+    ]
+
+
+def test_parse_many_error():
+    '''Fail to parse many values when one does not match.'''
+    collections = clique.parse_many(['/path/to/file.%04d.ext [1-3]', ''])
+    assert next(collections) == clique.Collection(
+        '/path/to/file.', '.ext', 4, [1, 2, 3]
+    )
+
+    with pytest.raises(ValueError):
+        next(collections)
+
+
+def test_parse_many_on_error():
+    '''Parse many values reporting errors without stopping.'''
+    errors = []
+    collections = clique.parse_many(
+        ['', '/path/to/file.%04d.ext [1-3]', 'invalid'],
+        on_error=lambda value, error: errors.append((value, type(error)))
+    )
+
+    assert list(collections) == [
+        clique.Collection('/path/to/file.', '.ext', 4, [1, 2, 3])
+    ]
+    assert errors == [('', ValueError), ('invalid', ValueError)]
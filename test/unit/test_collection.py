@@ -4,6 +4,8 @@
 
 import sys
 import inspect
+import pickle
+import copy
 
 import pytest
 
@@ -53,6 +55,16 @@ def test_change_property(name, value, pattern, item):
     assert list(collection)[0] == item
 
 
+def test_shared_expression():
+    '''Share compiled expression between compatible collections.'''
+    collection_a = Collection('shared_head.', '.tail', 0)
+    collection_b = Collection('shared_head.', '.tail', 4)
+    assert collection_a._expression is collection_b._expression
+
+    collection_b.head = 'other_head.'
+    assert collection_a._expression is not collection_b._expression
+
+
 def test_unsettable_indexes():
     '''Set new indexes by attribute assignment.'''
     collection = Collection('head.', '.tail', 0, indexes=set([1]))
@@ -60,6 +72,39 @@ def test_unsettable_indexes():
         collection.indexes = [1, 3]
 
 
+def test_no_instance_dictionary():
+    '''Store attributes in slots rather than an instance dictionary.'''
+    collection = Collection('head.', '.tail', 0, indexes=set([1]))
+    assert not hasattr(collection, '__dict__')
+
+    with pytest.raises(AttributeError):
+        collection.other = True
+
+
+@pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle(protocol):
+    '''Pickle and restore collection.'''
+    collection = Collection('head.', '.tail', 4, indexes=set([1, 2, 5]))
+    str(collection)
+
+    restored = pickle.loads(pickle.dumps(collection, protocol))
+    assert restored == collection
+    assert str(restored) == str(collection)
+
+    restored.indexes.add(3)
+    assert str(restored) == 'head.%04d.tail [1-3, 5]'
+
+
+def test_copy():
+    '''Copy collection.'''
+    collection = Collection('head.', '.tail', 4, indexes=set([1, 2, 5]))
+    copied = copy.deepcopy(collection)
+    assert copied == collection
+
+    copied.indexes.add(3)
+    assert collection.indexes == set([1, 2, 5])
+
+
 def test_str():
     '''String representation.'''
     collection = Collection('head.', '.tail', 0, indexes=set([1, 2, 3]))
@@ -104,6 +149,51 @@ def test_contains(item, expected):
     assert (item in collection) == expected
 
 
+@pytest.mark.parametrize(('collection', 'item', 'expected'), [
+    (UnpaddedCollection(indexes=set([1])), '/head.1.ext', True),
+    (UnpaddedCollection(indexes=set([1])), '/head.01.ext', False),
+    (UnpaddedCollection(indexes=set([0])), '/head.0.ext', True),
+    (PaddedCollection(indexes=set([1])), '/head.001.ext', False),
+    (PaddedCollection(indexes=set([1])), '/head.00001.ext', False),
+    (PaddedCollection(indexes=set([1])), '/head..ext', False),
+    (PaddedCollection(indexes=set([1])), '/head.0a01.ext', False),
+    (PaddedCollection(indexes=set([1])), '/head.ext', False),
+    (PaddedCollection(indexes=set([1])), '/head.0001.ext\n', True),
+    (Collection('/head.', '', 4, indexes=set([1])), '/head.0001\n', True)
+], ids=[
+    'unpadded',
+    'unpadded with leading zero',
+    'unpadded zero',
+    'padded too short',
+    'padded too long',
+    'missing index',
+    'non digit index',
+    'overlapping head and tail',
+    'trailing newline',
+    'trailing newline after index'
+])
+def test_contains_index_validation(collection, item, expected):
+    '''Validate index when checking whether collection contains item.'''
+    assert (item in collection) == expected
+
+    match = collection.match(item)
+    assert (match is not None and int(match.group('index')) in
+            collection.indexes) == expected
+
+
+def test_contains_many():
+    '''Check whether collection contains each of many items.'''
+    collection = PaddedCollection(indexes=set([1, 2]))
+    items = [
+        '/head.0001.ext', '/head.0003.ext', '/head.1.ext',
+        '/diff_head.0002.ext', '/head.0002.ext'
+    ]
+    assert collection.contains_many(items) == [
+        True, False, False, False, True
+    ]
+    assert collection.contains_many([]) == []
+
+
 @pytest.mark.parametrize(('collection_a', 'collection_b', 'expected'), [
     (Collection('head', 'tail', 0), Collection('head', 'tail', 0), 0),
     (Collection('head', 'tail', 0), Collection('diff_head', 'tail', 0), -1),
@@ -250,6 +340,39 @@ def test_format(CollectionCls, pattern, expected):
     assert collection.format(pattern) == expected
 
 
+@pytest.mark.parametrize(('indexes', 'pattern', 'expected'), [
+    (set([]), '{range}|{ranges}|{holes}', '||'),
+    (set([5]), '{range}|{ranges}|{holes}', '5|5|'),
+    (set([1, 2, 3]), '{range}|{ranges}|{holes}', '1-3|1-3|'),
+    (set([1, 3, 4, 10]), '{range}|{ranges}|{holes}', '1-10|1, 3-4, 10|2, 5-9')
+], ids=[
+    'empty',
+    'single index',
+    'contiguous indexes',
+    'non-contiguous indexes'
+])
+def test_format_ranges(indexes, pattern, expected):
+    '''Format range keys of collection.'''
+    collection = PaddedCollection(indexes=indexes)
+    assert collection.format(pattern) == expected
+
+
+def test_format_after_change():
+    '''Format collection after indexes change.'''
+    collection = PaddedCollection(indexes=set([1, 2, 3]))
+    assert collection.format('{ranges}') == '1-3'
+
+    collection.indexes.add(5)
+    assert collection.format('{ranges}') == '1-3, 5'
+
+    collection.indexes.discard(2)
+    assert collection.format('{ranges}') == '1, 3, 5'
+    assert collection.format('{holes}') == '2, 4'
+
+    collection.indexes.clear()
+    assert collection.format('{ranges}') == ''
+
+
 def test_format_sparse_collection():
     '''Format sparse collection without recursion error.'''
     recursion_limit = sys.getrecursionlimit()
@@ -309,6 +432,42 @@ def test_holes(indexes, expected):
     assert holes.indexes == expected
 
 
+@pytest.mark.parametrize(('indexes', 'expected'), [
+    (set([]), []),
+    (set([1]), []),
+    (set([1, 2, 3]), []),
+    (set([1, 5, 6, 7, 12]), [(2, 4), (8, 11)]),
+    (set([1, 10000000]), [(2, 9999999)])
+], ids=[
+    'empty',
+    'single index',
+    'contiguous indexes',
+    'multiple ranges of missing indexes',
+    'large hole'
+])
+def test_iter_holes(indexes, expected):
+    '''Iterate over holes in collection.'''
+    collection = PaddedCollection(indexes=indexes)
+    assert list(collection.iter_holes()) == expected
+
+
+@pytest.mark.parametrize(('indexes', 'expected'), [
+    (set([]), []),
+    (set([1]), [(1, 1)]),
+    (set([1, 2, 3]), [(1, 3)]),
+    (set([1, 2, 5, 6, 7, 9]), [(1, 2), (5, 7), (9, 9)])
+], ids=[
+    'empty',
+    'single index',
+    'contiguous indexes',
+    'non-contiguous indexes'
+])
+def test_iter_runs(indexes, expected):
+    '''Iterate over contiguous runs in collection.'''
+    collection = PaddedCollection(indexes=indexes)
+    assert list(collection.iter_runs()) == expected
+
+
 @pytest.mark.parametrize(('collection_a', 'collection_b', 'expected'), [
     (Collection('head', 'tail', 0),
      Collection('head', 'tail', 0, indexes=set([1, 2])),
@@ -360,6 +519,78 @@ def test_incompatible_merge(collection_a, collection_b):
         collection_a.merge(collection_b)
 
 
+@pytest.mark.parametrize(('operation', 'expected'), [
+    ('union', set([1, 2, 3, 4, 5, 8, 9])),
+    ('intersection', set([3, 4])),
+    ('difference', set([1, 2])),
+    ('symmetric_difference', set([1, 2, 5, 8, 9]))
+], ids=[
+    'union',
+    'intersection',
+    'difference',
+    'symmetric difference'
+])
+def test_set_operation(operation, expected):
+    '''Combine compatible collections with set operation.'''
+    collection_a = PaddedCollection(indexes=set([1, 2, 3, 4]))
+    collection_b = PaddedCollection(indexes=set([3, 4, 5, 8, 9]))
+
+    result = getattr(collection_a, operation)(collection_b)
+    assert result.indexes == expected
+    assert result.is_compatible(collection_a)
+    assert collection_a.indexes == set([1, 2, 3, 4])
+
+
+@pytest.mark.parametrize(('operator', 'expected'), [
+    ('__or__', set([1, 2, 3, 4, 5, 8, 9])),
+    ('__and__', set([3, 4])),
+    ('__sub__', set([1, 2])),
+    ('__xor__', set([1, 2, 5, 8, 9])),
+    ('__ior__', set([1, 2, 3, 4, 5, 8, 9])),
+    ('__iand__', set([3, 4])),
+    ('__isub__', set([1, 2])),
+    ('__ixor__', set([1, 2, 5, 8, 9]))
+], ids=[
+    'or',
+    'and',
+    'sub',
+    'xor',
+    'in place or',
+    'in place and',
+    'in place sub',
+    'in place xor'
+])
+def test_set_operator(operator, expected):
+    '''Combine compatible collections with set operator.'''
+    collection_a = PaddedCollection(indexes=set([1, 2, 3, 4]))
+    collection_b = PaddedCollection(indexes=set([3, 4, 5, 8, 9]))
+
+    result = getattr(collection_a, operator)(collection_b)
+    assert result.indexes == expected
+
+    if operator.startswith('__i'):
+        assert result is collection_a
+
+
+@pytest.mark.parametrize('operation', [
+    'union', 'intersection', 'difference', 'symmetric_difference',
+    '__iand__', '__isub__', '__ixor__'
+])
+def test_incompatible_set_operation(operation):
+    '''Fail to combine incompatible collections.'''
+    collection_a = Collection('head', 'tail', 0, indexes=set([1]))
+    collection_b = Collection('head', 'tail', 4, indexes=set([1]))
+    with pytest.raises(CollectionError):
+        getattr(collection_a, operation)(collection_b)
+
+
+def test_set_operator_not_implemented():
+    '''Return NotImplemented for set operator with non collection.'''
+    collection = PaddedCollection(indexes=set([1]))
+    for operator in ('__or__', '__and__', '__sub__', '__xor__', '__ior__'):
+        assert getattr(collection, operator)(set([1])) is NotImplemented
+
+
 @pytest.mark.parametrize(('collection', 'expected'), [
     (PaddedCollection(indexes=set([])), [set([])]),
     (PaddedCollection(indexes=set([1])), [set([1])]),
@@ -0,0 +1,158 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import pytest
+
+from clique.collection import Collection
+from clique.collection_index import CollectionIndex
+
+
+@pytest.fixture()
+def collections():
+    '''Return collections to index.'''
+    return [
+        Collection('/show/plate.', '.exr', 4, indexes=set([1, 2, 3, 1001])),
+        Collection('/show/plate.', '.exr', 0, indexes=set([5, 6, 1002])),
+        Collection('/show/plate.', '.dpx', 0, indexes=set([1, 2])),
+        Collection('/show/v', '/render.1001.exr', 0, indexes=set([1, 2])),
+        Collection('/show/v1/render.', '.exr', 4, indexes=set([1001, 1002]))
+    ]
+
+
+@pytest.mark.parametrize(('item', 'expected'), [
+    ('/show/plate.0001.exr', 0),
+    ('/show/plate.1001.exr', 0),
+    ('/show/plate.6.exr', 1),
+    ('/show/plate.1002.exr', 1),
+    ('/show/plate.2.dpx', 2),
+    ('/show/v2/render.1001.exr', 3),
+    ('/show/v1/render.1002.exr', 4),
+    ('/show/plate.0004.exr', None),
+    ('/show/plate.001.exr', None),
+    ('/show/plate.02.dpx', None),
+    ('/show/plate.1.tif', None),
+    ('/show/readme.txt', None)
+], ids=[
+    'padded',
+    'padded without leading zero',
+    'unpadded',
+    'unpadded with padded width',
+    'other tail',
+    'first digits',
+    'last digits',
+    'missing index',
+    'wrong padding',
+    'unexpected padding',
+    'unknown tail',
+    'no digits'
+])
+def test_lookup(collections, item, expected):
+    '''Look up collection item is a member of.'''
+    index = CollectionIndex(collections)
+    result = index.lookup(item)
+
+    if expected is None:
+        assert result is None
+    else:
+        assert result is collections[expected]
+
+
+@pytest.mark.parametrize(('collection', 'item'), [
+    (Collection('/show/v1', '.exr', 0, indexes=set([2])), '/show/v12.exr'),
+    (Collection('/show/v', '1.exr', 2, indexes=set([2])), '/show/v021.exr')
+], ids=[
+    'head ending with digit',
+    'tail starting with digit'
+])
+def test_lookup_partial_digits(collections, collection, item):
+    '''Look up collection with digits adjacent to index.'''
+    index = CollectionIndex(collections)
+    assert index.lookup(item) is None
+
+    index.add(collection)
+    assert index.lookup(item) is collection
+
+    index.remove(collection)
+    assert index.lookup(item) is None
+
+
+def test_lookup_matches_contains(collections):
+    '''Look up same collection as checking each collection in turn.'''
+    index = CollectionIndex(collections)
+    items = [
+        '/show/plate.{0}.{1}'.format(value, extension)
+        for value in ('1', '0001', '6', '1001', '1002', '01002', '7')
+        for extension in ('exr', 'dpx')
+    ]
+
+    for item in items:
+        expected = [
+            collection for collection in collections if item in collection
+        ]
+        assert index.lookup(item) is (expected[0] if expected else None)
+
+
+def test_lookup_many(collections):
+    '''Look up collections for many items.'''
+    index = CollectionIndex(collections)
+    assert index.lookup_many([
+        '/show/plate.0002.exr', '/show/readme.txt', '/show/plate.1.dpx'
+    ]) == [collections[0], None, collections[2]]
+
+
+def test_lookup_case_insensitive(collections):
+    '''Look up collection ignoring case.'''
+    index = CollectionIndex(collections, case_sensitive=False)
+    assert index.lookup('/SHOW/Plate.0001.EXR') is collections[0]
+
+    index = CollectionIndex(collections)
+    assert index.lookup('/SHOW/Plate.0001.EXR') is None
+
+
+def test_lookup_modified_indexes(collections):
+    '''Look up collection after its indexes change.'''
+    index = CollectionIndex(collections)
+    assert index.lookup('/show/plate.0004.exr') is None
+
+    collections[0].indexes.add(4)
+    assert index.lookup('/show/plate.0004.exr') is collections[0]
+
+
+def test_add_and_remove(collections):
+    '''Add and remove collections.'''
+    index = CollectionIndex()
+    assert len(index) == 0
+    assert index.lookup('/show/plate.0001.exr') is None
+
+    for collection in collections:
+        index.add(collection)
+
+    assert len(index) == len(collections)
+    assert sorted(index) == sorted(collections)
+
+    index.remove(collections[0])
+    assert len(index) == len(collections) - 1
+    assert index.lookup('/show/plate.0001.exr') is None
+    assert index.lookup('/show/plate.6.exr') is collections[1]
+
+
+def test_add_same_key(collections):
+    '''Add collections with same head, tail and padding.'''
+    other = Collection('/show/plate.', '.exr', 4, indexes=set([9]))
+    index = CollectionIndex(collections + [other])
+
+    assert index.lookup('/show/plate.0001.exr') is collections[0]
+    assert index.lookup('/show/plate.0009.exr') is other
+
+    index.remove(collections[0])
+    assert index.lookup('/show/plate.0009.exr') is other
+
+
+def test_remove_missing(collections):
+    '''Fail to remove collection not in index.'''
+    index = CollectionIndex(collections)
+    with pytest.raises(KeyError):
+        index.remove(
+            Collection('/show/plate.', '.exr', 4, indexes=set([1, 2, 3, 1001]))
+        )
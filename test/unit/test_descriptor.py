@@ -23,3 +23,28 @@ def test_unsettable():
 
     with pytest.raises(AttributeError):
         instance.x = False
+
+
+class SlottedMock(object):
+    '''Mock class using slots for test.'''
+
+    __slots__ = ('_x',)
+
+    x = clique.descriptor.Unsettable('x', attribute='_x')
+
+
+def test_unsettable_slot():
+    '''Unsettable descriptor reads value from named slot.'''
+    instance = SlottedMock()
+    assert instance.x is None
+
+    instance._x = True
+    assert instance.x is True
+
+    with pytest.raises(AttributeError):
+        instance.x = False
+
+
+def test_unsettable_class_access():
+    '''Return descriptor when accessed on class.'''
+    assert isinstance(Mock.x, clique.descriptor.Unsettable)
@@ -0,0 +1,354 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import os
+import threading
+import time
+
+import pytest
+
+import clique
+import clique.filesystem
+
+
+@pytest.fixture(params=['scandir', 'listdir'])
+def backend(request, monkeypatch):
+    '''Scan directories using each available backend.'''
+    if request.param == 'scandir':
+        if clique.filesystem._scandir is None:
+            pytest.skip('scandir is not available.')
+
+    else:
+        monkeypatch.setattr(clique.filesystem, '_scandir', None)
+
+    return request.param
+
+
+@pytest.fixture()
+def tree(tmpdir):
+    '''Return root of directory tree containing sequences.'''
+    for index in range(1, 4):
+        tmpdir.join('file.{0:04d}.exr'.format(index)).write('x' * index)
+
+    tmpdir.join('readme.txt').write('')
+    tmpdir.join('.hidden.0001.exr').write('')
+    tmpdir.join('.hidden.0002.exr').write('')
+
+    shot = tmpdir.mkdir('shot')
+    for index in range(10, 12):
+        shot.join('plate.{0}.dpx'.format(index)).write('')
+
+    shot.mkdir('nested').join('single.1.jpg').write('')
+    tmpdir.mkdir('.cache').join('cache.1.tmp').write('')
+
+    return str(tmpdir)
+
+
+def test_scan(backend, tree):
+    '''Scan single directory.'''
+    results = list(clique.scan(tree))
+    assert len(results) == 1
+
+    result = results[0]
+    assert result.path == tree
+    assert sorted(str(collection) for collection in result.collections) == [
+        '.hidden.%04d.exr [1-2]', 'file.%04d.exr [1-3]'
+    ]
+    assert sorted(result.remainder) == ['.cache', 'readme.txt', 'shot']
+    assert result.stats is None
+
+
+def test_scan_matches_assemble(backend, tree):
+    '''Scan directory with same result as assembling its listing.'''
+    result = next(clique.scan(tree, minimum_items=3))
+    collections, remainder = clique.assemble(
+        os.listdir(tree), minimum_items=3
+    )
+    assert sorted(result.collections) == sorted(collections)
+    assert sorted(result.remainder) == sorted(remainder)
+
+
+def test_scan_recursive(backend, tree):
+    '''Scan directory tree recursively.'''
+    results = dict(
+        (result.path, result)
+        for result in clique.scan(tree, recursive=True, include_hidden=False)
+    )
+    assert sorted(results) == [
+        tree,
+        os.path.join(tree, 'shot'),
+        os.path.join(tree, 'shot', 'nested')
+    ]
+
+    shot = results[os.path.join(tree, 'shot')]
+    assert [str(collection) for collection in shot.collections] == [
+        'plate.%d.dpx [10-11]'
+    ]
+    assert shot.remainder == ['nested']
+
+
+def test_scan_parent_before_children(backend, tree):
+    '''Yield result for directory before its subdirectories.'''
+    paths = [result.path for result in clique.scan(tree, recursive=True)]
+    assert paths[0] == tree
+    assert paths.index(os.path.join(tree, 'shot')) < paths.index(
+        os.path.join(tree, 'shot', 'nested')
+    )
+
+
+def test_scan_exclude_hidden(backend, tree):
+    '''Ignore hidden entries.'''
+    result = next(clique.scan(tree, include_hidden=False))
+    assert [str(collection) for collection in result.collections] == [
+        'file.%04d.exr [1-3]'
+    ]
+    assert sorted(result.remainder) == ['readme.txt', 'shot']
+
+
+def test_scan_filter(backend, tree):
+    '''Include only entries accepted by filter.'''
+    results = list(clique.scan(
+        tree, recursive=True, include_hidden=False,
+        filter=lambda entry: not entry.is_dir()
+    ))
+    assert len(results) == 3
+
+    result = results[0]
+    assert sorted(result.remainder) == ['readme.txt']
+
+
+def test_scan_stat(backend, tree):
+    '''Keep size and modification time of entries.'''
+    result = next(clique.scan(tree, stat=True, include_hidden=False))
+    assert sorted(result.stats) == [
+        'file.0001.exr', 'file.0002.exr', 'file.0003.exr', 'readme.txt',
+        'shot'
+    ]
+
+    collection = result.collections[0]
+    sizes = [result.stats[item].size for item in collection]
+    assert sizes == [1, 2, 3]
+
+    path = os.path.join(tree, 'file.0001.exr')
+    assert result.stats['file.0001.exr'].mtime == os.stat(path).st_mtime
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink'), reason='Requires symlinks.')
+@pytest.mark.parametrize('follow_symlinks', [False, True])
+def test_scan_symlinks(backend, tree, tmpdir_factory, follow_symlinks):
+    '''Follow symbolic links to directories only if requested.'''
+    target = tmpdir_factory.mktemp('target')
+    target.join('linked.1.exr').write('')
+    os.symlink(str(target), os.path.join(tree, 'link'))
+
+    paths = [
+        result.path for result in clique.scan(
+            tree, recursive=True, follow_symlinks=follow_symlinks
+        )
+    ]
+    assert (os.path.join(tree, 'link') in paths) == follow_symlinks
+
+
+def test_scan_error(backend, tmpdir):
+    '''Report directories that cannot be listed.'''
+    missing = str(tmpdir.join('missing'))
+    assert list(clique.scan(missing)) == []
+
+    errors = []
+    assert list(clique.scan(missing, onerror=errors.append)) == []
+    assert len(errors) == 1
+    assert isinstance(errors[0], OSError)
+
+
+def test_scan_assembler_options(backend, tree):
+    '''Pass additional options to assembler.'''
+    result = next(clique.scan(tree, minimum_items=4))
+    assert result.collections == []
+
+
+@pytest.mark.parametrize(('scan', 'expected'), [
+    (lambda path: clique.scan(path), False),
+    (lambda path: clique.scan(path, recursive=True), True),
+    (lambda path: clique.scan_tree(path, max_depth=0), False),
+    (lambda path: clique.scan_tree(path), True)
+], ids=[
+    'scan',
+    'recursive scan',
+    'scan tree at maximum depth',
+    'scan tree'
+])
+def test_scan_checks_directories_when_recursing(
+    backend, tree, monkeypatch, scan, expected
+):
+    '''Only check whether entries are directories when recursing.'''
+    checked = []
+    iter_entries = clique.filesystem._iter_entries
+
+    class Entry(object):
+        '''Directory entry recording calls to is_dir.'''
+
+        def __init__(self, entry):
+            '''Initialise wrapping *entry*.'''
+            self._entry = entry
+            self.name = entry.name
+            self.path = entry.path
+
+        def is_dir(self, follow_symlinks=True):
+            '''Record call and return whether entry is a directory.'''
+            checked.append(self.name)
+            return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+        def stat(self, follow_symlinks=True):
+            '''Return stat result for entry.'''
+            return self._entry.stat(follow_symlinks=follow_symlinks)
+
+    monkeypatch.setattr(
+        clique.filesystem, '_iter_entries',
+        lambda path: (Entry(entry) for entry in iter_entries(path))
+    )
+
+    results = list(scan(tree))
+    assert results[0].path == tree
+    assert bool(checked) == expected
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_scan_tree(backend, tree, workers):
+    '''Scan directory tree concurrently.'''
+    expected = dict(
+        (result.path, result) for result in clique.scan(tree, recursive=True)
+    )
+
+    results = list(clique.scan_tree(tree, workers=workers))
+    assert sorted(result.path for result in results) == sorted(expected)
+
+    for result in results:
+        assert result == expected[result.path]
+
+    paths = [result.path for result in results]
+    assert paths[0] == tree
+    assert paths.index(os.path.join(tree, 'shot')) < paths.index(
+        os.path.join(tree, 'shot', 'nested')
+    )
+
+
+@pytest.mark.parametrize(('max_depth', 'expected'), [
+    (0, ['']),
+    (1, ['', '.cache', 'shot']),
+    (None, ['', '.cache', 'shot', os.path.join('shot', 'nested')])
+], ids=[
+    'root only',
+    'immediate subdirectories',
+    'unlimited'
+])
+def test_scan_tree_max_depth(backend, tree, max_depth, expected):
+    '''Limit depth of directory tree scan.'''
+    paths = [
+        os.path.relpath(result.path, tree) if result.path != tree else ''
+        for result in clique.scan_tree(tree, max_depth=max_depth)
+    ]
+    assert sorted(paths) == expected
+
+
+def test_scan_tree_options(backend, tree):
+    '''Pass scan options through when scanning tree.'''
+    results = list(clique.scan_tree(
+        tree, include_hidden=False, stat=True, minimum_items=3
+    ))
+    assert len(results) == 3
+
+    root = [result for result in results if result.path == tree][0]
+    assert [str(collection) for collection in root.collections] == [
+        'file.%04d.exr [1-3]'
+    ]
+    assert root.stats['file.0003.exr'].size == 3
+
+
+def test_scan_tree_assembly_stats(backend, tree):
+    '''Record assembly statistics for all directories in tree.'''
+    expected = clique.AssemblyStats()
+    list(clique.scan(tree, recursive=True, stats=expected))
+
+    stats = clique.AssemblyStats()
+    list(clique.scan_tree(tree, workers=2, stats=stats))
+
+    assert stats.items == expected.items > 0
+    assert stats.collections == expected.collections
+    assert stats.remainder == expected.remainder
+
+
+def test_scan_tree_concurrent(tmpdir, monkeypatch):
+    '''Scan several directories at once.'''
+    for index in range(8):
+        tmpdir.mkdir('shot{0}'.format(index))
+
+    scan_directory = clique.filesystem._scan_directory
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def slow_scan_directory(*args):
+        '''Scan directory slowly, recording concurrent scans.'''
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+
+        time.sleep(0.05)
+
+        with lock:
+            active[0] -= 1
+
+        return scan_directory(*args)
+
+    monkeypatch.setattr(
+        clique.filesystem, '_scan_directory', slow_scan_directory
+    )
+
+    results = list(clique.scan_tree(str(tmpdir), workers=4))
+    assert len(results) == 9
+    assert peak[0] > 1
+
+
+def test_scan_tree_cancel(backend, tree):
+    '''Stop scanning tree when cancelled.'''
+    cancel = threading.Event()
+    results = []
+    for result in clique.scan_tree(tree, workers=1, cancel=cancel):
+        results.append(result)
+        cancel.set()
+
+    assert len(results) == 1
+    assert results[0].path == tree
+
+
+def test_scan_tree_close(backend, tree):
+    '''Stop worker threads when scan is closed early.'''
+    existing = threading.active_count()
+
+    scanner = clique.scan_tree(tree, workers=4)
+    next(scanner)
+    assert threading.active_count() > existing
+
+    scanner.close()
+    assert threading.active_count() == existing
+
+
+def test_scan_tree_error(backend, tmpdir):
+    '''Report directories that cannot be listed when scanning tree.'''
+    missing = str(tmpdir.join('missing'))
+
+    errors = []
+    assert list(clique.scan_tree(missing, onerror=errors.append)) == []
+    assert len(errors) == 1
+    assert isinstance(errors[0], OSError)
+
+
+def test_scan_tree_unexpected_error(tree):
+    '''Propagate unexpected errors raised whilst scanning tree.'''
+    def entry_filter(entry):
+        '''Raise error for entry.'''
+        raise ValueError('Unexpected.')
+
+    with pytest.raises(ValueError):
+        list(clique.scan_tree(tree, filter=entry_filter))
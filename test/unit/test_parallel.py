@@ -0,0 +1,60 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+import pytest
+
+import clique
+import clique.parallel
+
+
+@pytest.fixture
+def items(request):
+    '''Return items to assemble.'''
+    items = ['file.ext', 'single.1.ext', 'ALL.0001.dpx', 'all.0002.dpx']
+    for shot in range(1, 4):
+        for frame in range(998, 1003):
+            items.append('sh{0:03d}_v1.{1:04d}.exr'.format(shot, frame))
+            items.append('sh{0:03d}_v2.{1}.exr'.format(shot, frame))
+
+    return items
+
+
+@pytest.mark.parametrize(('options'), [
+    {},
+    {'minimum_items': 3},
+    {'case_sensitive': False},
+    {'assume_padded_when_ambiguous': True},
+    {'patterns': [clique.PATTERNS['frames']]}
+], ids=[
+    'default',
+    'minimum items',
+    'case insensitive',
+    'assume padded',
+    'patterns'
+])
+@pytest.mark.parametrize(('workers'), [1, 2], ids=['serial', 'parallel'])
+def test_assemble(items, options, workers):
+    '''Assemble items in parallel matching serial result.'''
+    expected = clique.assemble(items, **options)
+    result = clique.parallel.assemble(
+        items, workers=workers, chunk_size=7, **options
+    )
+
+    assert result[0] == expected[0]
+    assert result[1] == expected[1]
+
+
+@pytest.mark.parametrize(('workers'), [1, 2], ids=['serial', 'parallel'])
+def test_assemble_stats(items, workers):
+    '''Record statistics from all workers.'''
+    expected = clique.AssemblyStats()
+    clique.assemble(items, stats=expected)
+
+    stats = clique.AssemblyStats()
+    clique.parallel.assemble(
+        items, workers=workers, chunk_size=7, stats=stats
+    )
+
+    for key in ('items', 'unmatched', 'matches', 'keys', 'collections'):
+        assert getattr(stats, key) == getattr(expected, key)
@@ -2,6 +2,13 @@
 # :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
 # :license: See LICENSE.txt.
 
+import pickle
+
+try:
+    from collections.abc import MutableSet
+except ImportError:
+    from collections import MutableSet
+
 import pytest
 
 from clique.sorted_set import SortedSet
@@ -96,3 +103,219 @@ def test_iter():
     sorted_set = SortedSet([5, 2, 3, 4, 8, 9, 1, 1])
     assert list(sorted_set) == [1, 2, 3, 4, 5, 8, 9]
 
+
+@pytest.mark.parametrize(('items', 'expected'), [
+    ([], []),
+    ([1], [(1, 1)]),
+    ([3, 1, 2], [(1, 3)]),
+    ([1, 2, 3, 7, 9, 10], [(1, 3), (7, 7), (9, 10)]),
+    ([-2, -1, 0, 1], [(-2, 1)])
+], ids=[
+    'empty',
+    'single item',
+    'contiguous items',
+    'multiple runs',
+    'negative items'
+])
+def test_runs(items, expected):
+    '''Retrieve contiguous runs of items.'''
+    sorted_set = SortedSet(items)
+    assert list(sorted_set.runs()) == expected
+
+
+@pytest.mark.parametrize(('items', 'item', 'expected'), [
+    ([1, 2], 4, [(1, 2), (4, 4)]),
+    ([1, 2], 3, [(1, 3)]),
+    ([2, 3], 1, [(1, 3)]),
+    ([1, 3], 2, [(1, 3)]),
+    ([1, 3], 3, [(1, 1), (3, 3)])
+], ids=[
+    'new run',
+    'extend run end',
+    'extend run start',
+    'join runs',
+    'existing item'
+])
+def test_add_runs(items, item, expected):
+    '''Add item and maintain runs.'''
+    sorted_set = SortedSet(items)
+    sorted_set.add(item)
+    assert list(sorted_set.runs()) == expected
+    assert len(sorted_set) == sum(end - start + 1 for start, end in expected)
+
+
+@pytest.mark.parametrize(('items', 'start', 'end', 'expected'), [
+    ([], 1, 3, [(1, 3)]),
+    ([1, 2, 3], 5, 3, [(1, 3)]),
+    ([1, 2, 3], 5, 8, [(1, 3), (5, 8)]),
+    ([1, 2, 3], 4, 8, [(1, 8)]),
+    ([1, 5, 6, 10, 20], 2, 12, [(1, 12), (20, 20)]),
+    ([5, 6, 7], 1, 10, [(1, 10)])
+], ids=[
+    'empty',
+    'invalid range',
+    'separate range',
+    'adjacent range',
+    'overlapping runs',
+    'covering range'
+])
+def test_add_range(items, start, end, expected):
+    '''Add range of items.'''
+    sorted_set = SortedSet(items)
+    sorted_set.add_range(start, end)
+    assert list(sorted_set.runs()) == expected
+    assert len(sorted_set) == sum(end - start + 1 for start, end in expected)
+
+
+@pytest.mark.parametrize(('item', 'expected'), [
+    (1, [(2, 5)]),
+    (5, [(1, 4)]),
+    (3, [(1, 2), (4, 5)])
+], ids=[
+    'run start',
+    'run end',
+    'split run'
+])
+def test_discard_runs(item, expected):
+    '''Discard item and maintain runs.'''
+    sorted_set = SortedSet([1, 2, 3, 4, 5])
+    sorted_set.discard(item)
+    assert list(sorted_set.runs()) == expected
+    assert len(sorted_set) == 4
+
+
+@pytest.mark.parametrize(('sorted_set', 'other', 'expected'), [
+    (SortedSet([1, 2, 3]), SortedSet([3, 2, 1]), True),
+    (SortedSet([1, 2, 3]), SortedSet([1, 3]), False),
+    (SortedSet([1, 2, 3]), set([1, 2, 3]), True),
+    (SortedSet([1, 2, 3]), set([1, 2]), False)
+], ids=[
+    'equal sorted sets',
+    'different sorted sets',
+    'equal set',
+    'different set'
+])
+def test_equality(sorted_set, other, expected):
+    '''Compare sets for equality.'''
+    assert (sorted_set == other) is expected
+    assert (sorted_set != other) is (not expected)
+
+
+@pytest.mark.parametrize(('items', 'iterable', 'expected'), [
+    ([], [3, 1, 2, 2], [(1, 3)]),
+    ([1, 2], [4, 5, 7], [(1, 2), (4, 5), (7, 7)]),
+    ([1, 2], [3, 4, 7], [(1, 4), (7, 7)]),
+    ([5, 10], [1, 6, 7, 12, 11], [(1, 1), (5, 7), (10, 12)]),
+    ([1, 5], SortedSet([2, 3, 4, 8]), [(1, 5), (8, 8)]),
+    ([1, 2], [], [(1, 2)])
+], ids=[
+    'empty set',
+    'append beyond end',
+    'extend last run',
+    'interleaved',
+    'sorted set',
+    'empty iterable'
+])
+def test_update_runs(items, iterable, expected):
+    '''Update with items and maintain runs.'''
+    sorted_set = SortedSet(items)
+    sorted_set.update(iterable)
+    assert list(sorted_set.runs()) == expected
+    assert len(sorted_set) == sum(end - start + 1 for start, end in expected)
+
+
+@pytest.mark.parametrize(('items', 'start', 'end', 'expected'), [
+    ([], 1, 3, []),
+    ([1, 2, 3], 3, 1, [(1, 3)]),
+    ([1, 2, 3], 5, 8, [(1, 3)]),
+    ([1, 2, 3, 4, 5], 2, 4, [(1, 1), (5, 5)]),
+    ([1, 2, 3, 4, 5], 1, 2, [(3, 5)]),
+    ([1, 2, 3, 7, 8, 9], 2, 8, [(1, 1), (9, 9)]),
+    ([1, 2, 3, 7, 8, 9], 0, 10, [])
+], ids=[
+    'empty',
+    'invalid range',
+    'range outside runs',
+    'split run',
+    'run start',
+    'across runs',
+    'covering range'
+])
+def test_discard_range(items, start, end, expected):
+    '''Discard range of items.'''
+    sorted_set = SortedSet(items)
+    sorted_set.discard_range(start, end)
+    assert list(sorted_set.runs()) == expected
+    assert len(sorted_set) == sum(end - start + 1 for start, end in expected)
+
+
+@pytest.mark.parametrize(('items', 'other'), [
+    ([], []),
+    ([1, 2, 3], []),
+    ([], [1, 2, 3]),
+    ([1, 2, 3], [4, 5, 6]),
+    ([1, 2, 3, 4, 5], [2, 3]),
+    ([1, 2, 3, 7, 8, 9], [3, 4, 5, 6, 7]),
+    ([1, 2, 3, 10, 11, 12], [0, 5, 11, 20]),
+    ([1, 2, 3], [1, 2, 3])
+], ids=[
+    'empty',
+    'empty other',
+    'empty self',
+    'adjacent runs',
+    'contained run',
+    'bridging run',
+    'scattered items',
+    'identical'
+])
+@pytest.mark.parametrize('operator', [
+    '__or__', '__and__', '__sub__', '__xor__',
+    '__ior__', '__iand__', '__isub__', '__ixor__'
+])
+def test_set_operator(items, other, operator):
+    '''Combine sets with operator and maintain runs.'''
+    expected = getattr(set(items), operator)(set(other))
+
+    sorted_set = SortedSet(items)
+    result = getattr(sorted_set, operator)(SortedSet(other))
+    assert list(result) == sorted(expected)
+    assert len(result) == len(expected)
+    assert list(result.runs()) == list(SortedSet(expected).runs())
+
+    if operator.startswith('__i'):
+        assert result is sorted_set
+
+
+@pytest.mark.parametrize('method', [
+    'difference_update', 'intersection_update', 'symmetric_difference_update'
+])
+def test_update_with_iterable(method):
+    '''Update set using plain iterable.'''
+    expected = set([1, 2, 3, 7, 8])
+    getattr(expected, method)([2, 3, 4, 9])
+
+    sorted_set = SortedSet([1, 2, 3, 7, 8])
+    getattr(sorted_set, method)([2, 3, 4, 9])
+    assert list(sorted_set) == sorted(expected)
+
+
+@pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle(protocol):
+    '''Pickle and restore set.'''
+    sorted_set = SortedSet([1, 2, 5])
+    restored = pickle.loads(pickle.dumps(sorted_set, protocol))
+    assert list(restored.runs()) == [(1, 2), (5, 5)]
+    assert len(restored) == 3
+
+    restored.add(3)
+    assert list(restored.runs()) == [(1, 3), (5, 5)]
+
+
+def test_no_instance_dictionary():
+    '''Store attributes in slots rather than an instance dictionary.'''
+    sorted_set = SortedSet([1, 2, 5])
+    assert not hasattr(sorted_set, '__dict__')
+    assert isinstance(sorted_set, MutableSet)
+
+    with pytest.raises(AttributeError):
+        sorted_set.other = True
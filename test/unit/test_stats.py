@@ -0,0 +1,59 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2013 Martin Pengelly-Phillips
+# :license: See LICENSE.txt.
+
+from clique.stats import AssemblyStats
+
+
+def test_initial():
+    '''Start with all counts and timings zero.'''
+    stats = AssemblyStats()
+    values = stats.as_dict()
+    timings = values.pop('timings')
+
+    assert set(values.values()) == set([0])
+    assert timings == dict((phase, 0.0) for phase in AssemblyStats.PHASES)
+
+
+def test_reset():
+    '''Reset counts and timings.'''
+    stats = AssemblyStats()
+    stats.items = 10
+    stats.timings['scan'] = 1.5
+
+    stats.reset()
+    assert stats.as_dict() == AssemblyStats().as_dict()
+
+
+def test_add():
+    '''Add counts and timings from other statistics.'''
+    stats = AssemblyStats()
+    stats.items = 1
+    stats.timings['scan'] = 1.0
+
+    other = AssemblyStats()
+    other.items = 2
+    other.remainder = 3
+    other.timings['scan'] = 0.5
+    other.timings['filter'] = 0.25
+
+    stats.add(other)
+    assert stats.items == 3
+    assert stats.remainder == 3
+    assert stats.timings['scan'] == 1.5
+    assert stats.timings['filter'] == 0.25
+    assert other.items == 2
+
+
+def test_as_dict_is_copy():
+    '''Return dictionary independent of statistics.'''
+    stats = AssemblyStats()
+    values = stats.as_dict()
+    values['timings']['scan'] = 1.0
+
+    assert stats.timings['scan'] == 0.0
+
+
+def test_repr():
+    '''Include counts in representation.'''
+    assert repr(AssemblyStats()).startswith('<AssemblyStats {')